@@ -2,12 +2,18 @@
 from database.db_manager import DatabaseManager
 from utils.cart_manager import CartManager
 from utils.timetable_service import TimetableService
+from utils.schedule_cache import ScheduleCache
 
 class AppContext:
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.cart_manager = CartManager()
-        self.timetable_service = TimetableService()
+        self.cart_manager = CartManager(self.db_manager)
+        self.timetable_service = TimetableService(self.db_manager.get_catalog_version, ScheduleCache())
+
+    def close(self):
+        """Release the shared database connections"""
+        self.timetable_service.schedule_cache.close()
+        self.db_manager.close()
 
     @property
     def database(self):
@@ -22,4 +22,63 @@ COURSE_COLORS = [
 ]
 
 # Day names
-DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
\ No newline at end of file
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+# Timetable generation
+SCHEDULE_PAGE_SIZE = 20  # schedules generated per Previous/Next page
+SCHEDULE_MEMO_SIZE = 16  # solved carts kept in memory per session
+SCHEDULE_CACHE_FILE = "timetable_cache.db"  # sidecar file in data/
+SCHEDULE_CACHE_MAX_ENTRIES = 200
+SCHEDULE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+SECTION_AWARE_SCHEDULING = True  # pick one section per component ("CS101 A LEC" vs "CS101 B LEC")
+
+# Schedule ranking: penalty weights (0 = ignore), best RANKING_TOP_K schedules are kept
+SCHEDULE_RANKING_WEIGHTS = {
+    'campus_days': 3,  # days with classes
+    'idle_gaps': 2,    # hours between classes
+    'end_time': 1,     # hours after MIN_HOUR the day finishes
+    'lunch': 1,        # hours taught during lunch
+}
+RANKING_TOP_K = 50
+LUNCH_START = "12:00"
+LUNCH_END = "14:00"
+SCHEDULE_TIME_BUDGET_MS = 300  # show the best schedule found so far after this long
+
+# Database connections
+DB_STATEMENT_CACHE_SIZE = 256  # compiled statements kept per connection
+DB_PRAGMA_PROFILES = {
+    # Everyday browsing and cart edits: WAL lets readers run during an import
+    # and NORMAL skips the fsync on every commit
+    'interactive': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,  # KiB
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,  # ms to wait on a lock held by another connection
+        'wal_autocheckpoint': 1000,
+    },
+    # Catalog imports: bigger cache and no checkpoints until the import is done
+    'bulk_import': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 0,
+    },
+}
+DB_PRAGMA_PROFILE = 'interactive'
+DB_PRAGMAS = DB_PRAGMA_PROFILES[DB_PRAGMA_PROFILE]
+CATALOG_SNAPSHOT = True  # serve catalog reads from an in-memory copy of courses.db
+QUERY_CACHE_SIZE = 64  # DatabaseManager results kept until the next catalog or cart write
+
+# Imports
+IMPORT_BATCH_SIZE = 5000  # rows per executemany call
+IMPORT_CHUNK_SIZE = 20000  # CSV rows parsed, validated and committed at a time
+IMPORT_ERROR_LIMIT = 50  # invalid rows reported individually; the rest are only counted
+
+# Course search
+SEARCH_DEBOUNCE_MS = 200  # wait this long after the last keystroke before searching
+COURSE_PAGE_SIZE = 50  # courses loaded per page while browsing the catalog
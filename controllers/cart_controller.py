@@ -1,10 +1,8 @@
 # controllers/cart_controller.py
 from PySide6.QtWidgets import QMessageBox
-import sqlite3
 import logging
 from views.cart_page import CartPage
 from utils.cart_manager import CartManager
-from utils.timetable_service import TimetableService
 
 
 class CartController:
@@ -12,7 +10,6 @@ class CartController:
         self.parent = parent_window
         self.cart_page = CartPage()
         self.cart_manager = cart_manager or CartManager()
-        self.timetable_service = TimetableService()
         self.timetable_controller = None
 
         self.setup_connections()
@@ -64,18 +61,7 @@ class CartController:
             return
 
         try:
-            timetable_results = self.timetable_service.generate_timetable_combinations(cart_courses)
-            logging.info(f"Timetable results: {timetable_results}")
-
-            if not timetable_results:
-                QMessageBox.warning(
-                    self.cart_page,
-                    "No Valid Combinations",
-                    "Could not generate a valid timetable with selected courses. "
-                    "Please check for time conflicts."
-                )
-                return
-
+            # The search itself runs on the timetable controller's worker thread
             logging.info("Setting cart courses in timetable controller")
             self.parent.timetable_controller.set_cart_courses(cart_courses)
 
@@ -96,18 +82,15 @@ class CartController:
             self.parent.update_cart_count()
 
     def clear_cart(self):
-        try:
-            with self.cart_manager.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM cart')
-                conn.commit()
-                self.update_cart_display()
-                self.parent.update_cart_count()
-        except sqlite3.Error as e:
+        # Goes through DatabaseManager so cached cart reads are invalidated
+        if self.cart_manager.clear_cart():
+            self.update_cart_display()
+            self.parent.update_cart_count()
+        else:
             QMessageBox.critical(
                 self.cart_page,
                 "Error",
-                f"Error clearing cart: {str(e)}"
+                "Error clearing cart, see log.txt for details"
             )
 
     def get_page(self):
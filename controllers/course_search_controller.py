@@ -1,17 +1,36 @@
 print("Loading course_search_controller.py")
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QThread, QTimer, Signal, Slot
 from PySide6.QtWidgets import QMessageBox
 import logging
 from database.db_manager import DatabaseManager
 from views.course_search_page import CourseSearchPage
+from utils.workers import CourseSearchWorker
+from config import SEARCH_DEBOUNCE_MS, COURSE_PAGE_SIZE
 
 
-class CourseSearchController:
+class CourseSearchController(QObject):
+    search_requested = Signal(int, str)  # request id, query
+    page_requested = Signal(int, str)  # request id, last course code shown
+
     def __init__(self, parent_window, db_manager=None):
+        super().__init__()
         self.parent = parent_window
         self.search_page = CourseSearchPage()
         self.db = db_manager or DatabaseManager()
 
+        # Typing restarts the debounce timer; the search runs once it fires
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.handle_search)
+        self._request_id = 0
+        self._last_query = None
+        # Catalog browsing state (empty search): keyset cursor for the next page
+        self._last_code = None
+        self._has_more_pages = False
+        self._page_pending = False
+        self.start_search_worker()
+
         # Connect signals
         self.setup_connections()
 
@@ -40,30 +59,98 @@ class CourseSearchController:
 
     def setup_connections(self):
         # Connect search bar signals
-        self.search_page.search_bar.textChanged.connect(self.handle_search)
+        self.search_page.search_bar.textChanged.connect(self.schedule_search)
         self.search_page.search_bar.returnPressed.connect(self.handle_search)
 
         # Connect course list signals
         self.search_page.course_list.course_added.connect(self.handle_course_added)
+        self.search_page.course_list.load_more_requested.connect(self.load_more)
 
         logging.info("Course search controller connections set up")
 
-    def handle_search(self):
-        try:
-            search_text = self.search_page.search_bar.text().strip()
-
-            if not search_text:
-                self.load_all_courses()
-                return
-
-            # Search courses in database
-            courses = self.db.search_courses(search_text)
-            self.search_page.set_courses(courses)
+    # _____________________________________________background search_____________________________________________
+    def start_search_worker(self):
+        """Start the thread that runs all catalog queries for this page"""
+        self._search_thread = QThread()
+        self._search_worker = CourseSearchWorker(self.db)
+        self._search_worker.moveToThread(self._search_thread)
+
+        self.search_requested.connect(self._search_worker.search)
+        self.page_requested.connect(self._search_worker.load_page)
+        self._search_worker.results_ready.connect(self.on_search_results)
+        self._search_worker.page_ready.connect(self.on_page_ready)
+        self._search_worker.failed.connect(self.on_search_failed)
+        self._search_thread.finished.connect(self._search_worker.deleteLater)
+        self._search_thread.start()
+
+    def shutdown(self):
+        """Stop the search thread; call before the application exits"""
+        self._search_timer.stop()
+        self._search_worker.latest_request = self._request_id + 1
+        self._search_thread.quit()
+        self._search_thread.wait()
+
+    def schedule_search(self):
+        """Debounce keystrokes: (re)start the timer instead of searching now"""
+        self._search_timer.start()
 
-        except Exception as e:
-            error_msg = f"Error during course search: {str(e)}"
-            self.show_error_message("Search Error", error_msg)
-            logging.error(error_msg)
+    def handle_search(self):
+        """Search for the current text now, e.g. when the timer fires or on Enter"""
+        self._search_timer.stop()
+        self.run_search(self.search_page.search_bar.text().strip())
+
+    def run_search(self, query, force=False):
+        """Queue ``query`` on the worker unless it repeats the last one"""
+        if query == self._last_query and not force:
+            return
+        self._last_query = query
+        self._request_id += 1
+        self._has_more_pages = False
+        self._page_pending = False
+        # Lets the worker skip anything older that is still queued
+        self._search_worker.latest_request = self._request_id
+        self.search_requested.emit(self._request_id, query)
+
+    @Slot(int, str, list)
+    def on_search_results(self, request_id, query, courses):
+        if request_id != self._request_id:
+            return  # superseded by newer input
+        if not query and not courses:
+            self.show_error_message("No Courses", "No courses found in the database")
+            return
+        self.search_page.set_courses(courses)
+        if not query:
+            self._track_page(courses)
+
+    def _track_page(self, courses):
+        codes = list(dict.fromkeys(course['course_code'] for course in courses))
+        if codes:
+            self._last_code = codes[-1]
+        self._has_more_pages = len(codes) >= COURSE_PAGE_SIZE
+
+    def load_more(self):
+        """Fetch the next catalog page when the list is scrolled near its end"""
+        if not self._has_more_pages or self._page_pending:
+            return
+        self._page_pending = True
+        self.page_requested.emit(self._request_id, self._last_code)
+
+    @Slot(int, list)
+    def on_page_ready(self, request_id, courses):
+        if request_id != self._request_id:
+            return
+        self._page_pending = False
+        self.search_page.append_courses(courses)
+        self._track_page(courses)
+
+    @Slot(int, str)
+    def on_search_failed(self, request_id, message):
+        if request_id != self._request_id:
+            return
+        self._page_pending = False
+        error_msg = f"Error during course search: {message}"
+        self.show_error_message("Search Error", error_msg)
+        logging.error(error_msg)
 
     def handle_course_added(self, course_code):
         try:
@@ -93,19 +180,10 @@ class CourseSearchController:
             logging.error(error_msg)
 
     def load_all_courses(self):
-        try:
-            courses = self.db.get_all_courses()
-
-            if not courses:
-                self.show_error_message("No Courses", "No courses found in the database")
-                return
-
-            self.search_page.set_courses(courses)
-
-        except Exception as e:
-            error_msg = f"Error loading courses: {str(e)}"
-            self.show_error_message("Loading Error", error_msg)
-            logging.error(error_msg)
+        """Browse the catalog from its first page, regardless of the search text"""
+        self.run_search('', force=True)
 
     def refresh_courses(self):
-        self.load_all_courses()
\ No newline at end of file
+        """Re-run the current search, e.g. after the catalog was re-imported"""
+        self._search_timer.stop()
+        self.run_search(self.search_page.search_bar.text().strip(), force=True)
\ No newline at end of file
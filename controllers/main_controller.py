@@ -1,12 +1,10 @@
 # controllers/main_controller.py
 import logging
-import sys
 from main_window import MainWindow
 from controllers.timetable_controller import TimetableController
 from controllers.course_search_controller import CourseSearchController
 from controllers.cart_controller import CartController
 from controllers.translation_controller import TranslationController
-from database.db_init import init_database
 
 
 class MainController:
@@ -20,16 +18,17 @@ class MainController:
         # Store app context
         self.app_context = app_context
 
-        # Initialize database
-        if not init_database():
-            logging.error("Failed to initialize database")
-            sys.exit(1)
-
         # Create main window
         self.main_window = MainWindow()
+        if self.app_context:
+            self.main_window.db_manager = self.app_context.database
 
         # Initialize controllers with app context if available
-        self.timetable_controller = TimetableController(self.main_window)
+        self.timetable_controller = TimetableController(
+            self.main_window,
+            self.app_context.timetable if self.app_context else None,
+            self.app_context.database if self.app_context else None
+        )
         self.search_controller = CourseSearchController(
             self.main_window,
             self.app_context.database if self.app_context else None
@@ -63,6 +62,9 @@ class MainController:
         # Show initial page
         self.main_window.show_page("search")
 
+        # Previously solved carts come straight from the schedule cache
+        self.restore_timetable()
+
         logging.info("MainController initialized successfully")
 
     def connect_controllers(self):
@@ -72,5 +74,10 @@ class MainController:
         # Update cart count when switching to cart page
         self.main_window.view_cart.triggered.connect(self.cart_controller.show)
 
+    def restore_timetable(self):
+        cart_courses = self.cart_controller.cart_manager.get_cart_courses()
+        if cart_courses:
+            self.timetable_controller.set_cart_courses(cart_courses)
+
     def show(self):
         self.main_window.show()
\ No newline at end of file
@@ -1,19 +1,27 @@
 # controllers/timetable_controller.py
+from PySide6.QtCore import QObject, QThread, Slot
+from PySide6.QtWidgets import QMessageBox
 from views.timetable_page import TimetablePage
 from utils.timetable_service import TimetableService
+from utils.workers import TimetableWorker, SchedulePageWorker
+from config import SCHEDULE_TIME_BUDGET_MS
 import logging
 
 
-class TimetableController:
-    def __init__(self, parent_window):
+class TimetableController(QObject):
+    def __init__(self, parent_window, timetable_service=None, db_manager=None):
+        super().__init__()
         self.parent = parent_window
         self.timetable_page = TimetablePage()
-        self.timetable_service = TimetableService()
-        self.schedules = []
+        self.timetable_service = timetable_service or TimetableService()
+        self.db = db_manager
+        self.schedules = None
         self.course_groups = {}
         self.current_schedule_index = 0
         self.cart_courses = []
         self._is_updating = False
+        self._generation_worker = None
+        self._page_worker = None
 
         self.setup_connections()
         logging.info("TimetableController initialized")
@@ -21,26 +29,193 @@ class TimetableController:
     def set_cart_courses(self, cart_courses):
         logging.info(f"Setting cart courses: {cart_courses}")
         self.cart_courses = cart_courses
-        try:
-            result = self.timetable_service.generate_timetable_combinations(cart_courses)
-            if not isinstance(result, tuple) or len(result) != 2:
-                logging.error("generate_timetable_combinations did not return a tuple with two elements")
-                return
-
-            schedules, course_groups = result
-            self.set_schedules(schedules, course_groups)
-        except Exception as e:
-            logging.error(f"Error generating timetable: {str(e)}")
+        self.start_generation(cart_courses)
 
     def setup_connections(self):
         """Connect navigation buttons"""
         self.timetable_page.prev_button.clicked.connect(self.prev_schedule)
         self.timetable_page.next_button.clicked.connect(self.next_schedule)
+        self.timetable_page.cancel_button.clicked.connect(self.cancel_generation)
+        self.timetable_page.weights_changed.connect(self.set_ranking_weights)
+        self.timetable_page.set_weights(self.timetable_service.ranking_weights)
         logging.info("Timetable navigation buttons connected")
 
-    def set_schedules(self, schedules, course_groups):
-        """Set new schedules and display the first one"""
-        if not schedules:
+    # _____________________________________________background generation_____________________________________________
+    def start_generation(self, cart_courses):
+        """Run the schedule search on a worker thread"""
+        self.cancel_generation()
+
+        self.schedules = None
+        self._page_worker = None
+        self.current_schedule_index = 0
+        self.timetable_page.clear_timetable()
+        self.timetable_page.show_schedule_summary(None)
+        self.timetable_page.update_navigation_status(0, 0)
+        self.timetable_page.set_generating(True)
+
+        # Parented, so a cancelled thread stays alive until it has finished
+        thread = QThread(self)
+        worker = TimetableWorker(self.timetable_service, cart_courses, SCHEDULE_TIME_BUDGET_MS / 1000, self.db)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.progress.connect(self.on_generation_progress)
+        worker.partial_result.connect(self.on_partial_result)
+        worker.provisional.connect(self.on_provisional_result)
+        worker.finished.connect(self.on_generation_finished)
+        worker.failed.connect(self.on_generation_failed)
+        worker.cancelled.connect(self.on_generation_cancelled)
+        for done in (worker.finished, worker.failed, worker.cancelled):
+            done.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._generation_worker = worker
+        thread.start()
+
+    def set_ranking_weights(self, weights):
+        """Re-rank the current cart with the user's objective weights"""
+        self.timetable_service.set_ranking_weights(weights)
+        if self.cart_courses:
+            self.start_generation(self.cart_courses)
+
+    def cancel_generation(self, wait=False):
+        """Abort a running search; ``wait`` blocks until every worker thread has stopped"""
+        worker = self._generation_worker
+        if worker is not None:
+            worker.cancel()
+            self._generation_worker = None
+            self.timetable_page.set_generating(False)
+            self.timetable_page.progress_label.setText("Generation cancelled")
+            self.update_navigation_buttons()
+
+        if wait:
+            # Includes searches cancelled earlier and page loads still finishing
+            self._page_worker = None
+            for thread in self.findChildren(QThread):
+                thread.quit()
+                thread.wait()
+
+    def _is_current_worker(self):
+        # Signals from a cancelled worker may still be queued
+        return self.sender() is not None and self.sender() is self._generation_worker
+
+    @Slot(int, int)
+    def on_generation_progress(self, nodes, best_size):
+        if self._is_current_worker():
+            self.timetable_page.update_generation_progress(nodes, best_size)
+
+    @Slot(list)
+    def on_partial_result(self, selected):
+        """Preview the best schedule found so far while the search continues"""
+        if not self._is_current_worker():
+            return
+        try:
+            self.timetable_page.update_schedule(self.format_schedule(selected, self.course_groups_for(selected)))
+        except Exception as e:
+            logging.error(f"Error showing partial schedule: {str(e)}")
+
+    @Slot(object)
+    def on_provisional_result(self, cursor):
+        """Browse the best schedule found within the time budget while the search continues"""
+        if not self._is_current_worker():
+            return
+        self.set_schedules(cursor)
+        self.timetable_page.set_generating(True)
+        self.timetable_page.progress_label.setText(
+            "Showing the best timetable found so far, still searching for better ones..."
+        )
+
+    @Slot(object)
+    def on_generation_finished(self, cursor):
+        if not self._is_current_worker():
+            return
+        self._generation_worker = None
+        self.timetable_page.set_generating(False)
+        self.update_navigation_buttons()
+
+        if not cursor.is_known(0):
+            QMessageBox.warning(
+                self.timetable_page,
+                "No Valid Combinations",
+                "Could not generate a valid timetable with selected courses. "
+                "Please check for time conflicts."
+            )
+            return
+        self.set_schedules(cursor)
+
+    @Slot(str)
+    def on_generation_failed(self, message):
+        if not self._is_current_worker():
+            return
+        self._generation_worker = None
+        self.timetable_page.set_generating(False)
+        self.update_navigation_buttons()
+        QMessageBox.critical(
+            self.timetable_page,
+            "Error",
+            f"Error generating timetable: {message}"
+        )
+
+    @Slot()
+    def on_generation_cancelled(self):
+        logging.info("Timetable generation cancelled by user")
+
+    # _____________________________________________page prefetch_____________________________________________
+    def prefetch_next_page(self):
+        """Generate the page after the one on screen on a worker thread.
+
+        Navigation only ever moves onto schedules that are already known, so
+        the solver never runs on the GUI thread after the first page.
+        """
+        cursor = self.schedules
+        if cursor is None or cursor.exhausted or self._page_worker is not None:
+            return
+        if self.current_schedule_index + cursor.page_size < cursor.known_count:
+            return  # a whole page is still buffered ahead
+
+        thread = QThread(self)
+        worker = SchedulePageWorker(self.timetable_service, cursor, cursor.known_count)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(self.on_page_loaded)
+        worker.failed.connect(self.on_page_failed)
+        for done in (worker.finished, worker.failed):
+            done.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._page_worker = worker
+        thread.start()
+
+    @Slot(object)
+    def on_page_loaded(self, cursor):
+        if self.sender() is None or self.sender() is not self._page_worker:
+            return
+        self._page_worker = None
+        if cursor is self.schedules:
+            self.update_navigation_status()
+            self.update_navigation_buttons()
+
+    @Slot(str)
+    def on_page_failed(self, message):
+        if self.sender() is None or self.sender() is not self._page_worker:
+            return
+        self._page_worker = None
+        logging.error(f"Could not load more timetables: {message}")
+
+    def course_groups_for(self, selected):
+        """Session rows of the selected courses taken from the cart"""
+        groups = {}
+        for course in self.cart_courses:
+            if course['course_code'] in selected:
+                groups.setdefault(course['course_code'], []).append(course)
+        return groups
+
+    def set_schedules(self, schedules):
+        """Set a new schedule cursor and display the first schedule"""
+        if schedules is None or not schedules.is_known(0):
             logging.error("No schedules provided")
             return
 
@@ -50,13 +225,14 @@ class TimetableController:
         try:
             self._is_updating = True
             self.schedules = schedules
-            self.course_groups = course_groups
+            self.course_groups = schedules.course_groups
             self.current_schedule_index = 0
 
             if self.schedules:
                 self.show_current_schedule()
                 self.update_navigation_status()
                 self.update_navigation_buttons()
+                self.prefetch_next_page()
 
         except Exception as e:
             logging.error(f"Error setting schedules: {str(e)}", exc_info=True)
@@ -65,37 +241,44 @@ class TimetableController:
 
     def show_current_schedule(self):
         """Display the current schedule"""
-        if not self.schedules:
+        if self.schedules is None:
             logging.info("No schedules to display")
             return
 
         try:
-            current_schedule = self.schedules[self.current_schedule_index]
-            formatted_schedule = []
-
-            # Format selected courses for the timetable widget
-            for course_code in current_schedule['selected']:
-                for course in self.course_groups[course_code]:
-                    # Convert day number to day name
-                    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-                    day = days[course['day']] if 0 <= course['day'] < len(days) else "Unknown"
-
-                    formatted_course = {
-                        'code': course['course_code'],
-                        'day': day,
-                        'start_time': course['start_time'],
-                        'end_time': course['end_time'],
-                        'venue': course['venue'],
-                        'instructor' : course['instructor']
-                    }
-                    formatted_schedule.append(formatted_course)
+            current_schedule = self.schedules.get(self.current_schedule_index)
+            formatted_schedule = self.format_schedule(current_schedule['selected'], self.course_groups,
+                                                      current_schedule.get('alternatives'))
 
             # Update timetable widget with formatted schedule
             self.timetable_page.update_schedule(formatted_schedule)
+            self.timetable_page.show_schedule_summary(current_schedule.get('metrics'))
 
         except Exception as e:
             logging.error(f"Error showing schedule: {str(e)}", exc_info=True)
 
+    def format_schedule(self, selected, course_groups, alternatives=None):
+        """Format selected courses for the timetable widget"""
+        alternatives = alternatives or {}
+        formatted_schedule = []
+        for course_code in selected:
+            for course in course_groups[course_code]:
+                # Convert day number to day name
+                days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+                day = days[course['day']] if 0 <= course['day'] < len(days) else "Unknown"
+
+                formatted_course = {
+                    'code': course['course_code'],
+                    'day': day,
+                    'start_time': course['start_time'],
+                    'end_time': course['end_time'],
+                    'venue': course['venue'],
+                    'instructor' : course['instructor'],
+                    'alternatives': alternatives.get(course_code, [])
+                }
+                formatted_schedule.append(formatted_course)
+        return formatted_schedule
+
     def next_schedule(self):
         """Show next schedule if available"""
         if self._is_updating:
@@ -103,11 +286,12 @@ class TimetableController:
 
         try:
             self._is_updating = True
-            if self.current_schedule_index < len(self.schedules) - 1:
+            if self.schedules is not None and self.schedules.is_known(self.current_schedule_index + 1):
                 self.current_schedule_index += 1
                 self.show_current_schedule()
                 self.update_navigation_status()
                 self.update_navigation_buttons()
+                self.prefetch_next_page()
         finally:
             self._is_updating = False
 
@@ -130,14 +314,15 @@ class TimetableController:
         """Update the enabled state of navigation buttons"""
         self.timetable_page.prev_button.setEnabled(self.current_schedule_index > 0)
         self.timetable_page.next_button.setEnabled(
-            self.current_schedule_index < len(self.schedules) - 1
+            self.schedules is not None and self.schedules.is_known(self.current_schedule_index + 1)
         )
 
     def update_navigation_status(self):
         """Update the navigation status display"""
-        total = len(self.schedules)
+        total = self.schedules.known_count if self.schedules is not None else 0
+        more = self.schedules is not None and not self.schedules.exhausted
         current = self.current_schedule_index + 1 if total > 0 else 0
-        self.timetable_page.update_navigation_status(current, total)
+        self.timetable_page.update_navigation_status(current, total, more)
 
     def show(self):
         """Show the timetable page and current schedule"""
@@ -156,13 +341,8 @@ class TimetableController:
         return self.timetable_page
 
     def refresh_timetable(self):
-        """Refresh the timetable by re-generating the timetable combinations"""
+        """Refresh the timetable; unchanged carts are served from the service's memo"""
         if self.cart_courses:
-            try:
-                schedules, course_groups = self.timetable_service.generate_timetable_combinations(self.cart_courses)
-                self.set_schedules(schedules, course_groups)
-                self.show_current_schedule()
-            except Exception as e:
-                logging.error(f"Error refreshing timetable: {str(e)}")
+            self.start_generation(self.cart_courses)
         else:
             logging.info("No cart courses to refresh the timetable")
\ No newline at end of file
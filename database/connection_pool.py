@@ -0,0 +1,192 @@
+# database/connection_pool.py
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from config import DB_PRAGMAS, DB_PRAGMA_PROFILES, DB_STATEMENT_CACHE_SIZE
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections, one per thread, for a single database file.
+
+    Each thread lazily opens its own connection the first time it asks for
+    one and keeps it until the pool is closed, so callers no longer pay for
+    a connect per query. Connections are opened with a compiled-statement
+    cache of ``cached_statements`` entries and have ``pragmas`` applied once.
+    """
+
+    def __init__(self, db_path: str, pragmas: dict = None, cached_statements: int = DB_STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.pragmas = dict(DB_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread is off only so close_all can run from the main thread;
+        # every connection is still used by the thread that opened it
+        return sqlite3.connect(self.db_path, cached_statements=self.cached_statements, check_same_thread=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self._open()
+        self.apply_pragmas(conn, self.pragmas)
+        with self._lock:
+            self._connections[threading.get_ident()] = conn
+        logging.info(f"Opened database connection for thread {threading.get_ident()}")
+        return conn
+
+    @staticmethod
+    def apply_pragmas(conn: sqlite3.Connection, pragmas: dict):
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+    def apply_profile(self, name: str = None):
+        """Switch the calling thread's connection to a named PRAGMA profile.
+
+        With no name the pool's own PRAGMAs are restored. Must not be called
+        inside an open transaction, since journal_mode cannot change there.
+        """
+        conn = self.connection()
+        self.apply_pragmas(conn, self.pragmas if name is None else DB_PRAGMA_PROFILES[name])
+        if name is None:
+            # Fold in whatever a checkpoint-free profile left in the WAL
+            conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    @contextmanager
+    def profile(self, name: str):
+        """Run a block under another PRAGMA profile, e.g. 'bulk_import'"""
+        self.apply_profile(name)
+        try:
+            yield self.connection()
+        finally:
+            self.apply_profile()
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def session(self):
+        """Borrow the thread's connection.
+
+        Anything left uncommitted when the outermost session ends is rolled
+        back, matching the old connect/close behaviour; nested sessions on the
+        same thread share the transaction.
+        """
+        conn = self.connection()
+        self._local.depth += 1
+        try:
+            yield conn
+        except Exception:
+            if self._local.depth == 1 and conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    def release(self):
+        """Close the calling thread's connection, e.g. before a worker thread exits"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+        self._local.conn = None
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"Error closing database connection: {str(e)}")
+        self._local = threading.local()
+
+
+class SnapshotPool(ConnectionPool):
+    """One in-memory copy of another pool's database, shared by every thread for reads.
+
+    The first time any thread asks for a connection, the source database is
+    copied into a ``:memory:`` database with the backup API. Threads take
+    turns on that single connection: a session holds the pool's lock until
+    it ends, so the catalog sits in memory once however many threads read
+    it. After ``refresh()`` the next outermost session loads a fresh copy
+    and swaps it in, so a reader never sees a half-loaded catalog. Writes
+    must go to the source pool.
+    """
+
+    def __init__(self, source: ConnectionPool, cached_statements: int = DB_STATEMENT_CACHE_SIZE):
+        super().__init__(':memory:', pragmas={'temp_store': 'MEMORY'}, cached_statements=cached_statements)
+        self.source = source
+        self.generation = 0
+        self._conn = None
+        self._conn_generation = None
+        self._depth = 0
+        self._session_lock = threading.RLock()
+
+    def _open(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        # Opened without check_same_thread, so whichever thread holds the lock may use it
+        conn = super()._open()
+        with self.source.session() as source_conn:
+            source_conn.backup(conn)
+        logging.info(f"Loaded database snapshot in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return conn
+
+    def refresh(self):
+        """Mark the copy stale, e.g. after an import committed"""
+        with self._lock:
+            self.generation += 1
+
+    def connection(self) -> sqlite3.Connection:
+        """The shared connection, loaded on first use and reloaded once stale"""
+        with self._session_lock:
+            # Read the generation first so a refresh during the copy marks it stale
+            generation = self.generation
+            if self._conn is not None and self._depth == 0 and self._conn_generation != generation:
+                self.close_all()
+            if self._conn is None:
+                conn = self._open()
+                self.apply_pragmas(conn, self.pragmas)
+                self._conn, self._conn_generation = conn, generation
+            return self._conn
+
+    @contextmanager
+    def session(self):
+        """Borrow the shared connection, keeping other threads out until the block ends"""
+        with self._session_lock:
+            conn = self.connection()
+            self._depth += 1
+            try:
+                yield conn
+            except Exception:
+                if self._depth == 1 and conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and conn.in_transaction:
+                    conn.rollback()
+
+    def release(self):
+        """No-op: the copy is shared, so a worker thread exiting leaves it loaded"""
+
+    def close_all(self):
+        with self._session_lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logging.error(f"Error closing database snapshot: {str(e)}")
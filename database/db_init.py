@@ -3,36 +3,22 @@
 import sqlite3
 import logging
 from pathlib import Path
+from config import DB_PRAGMAS
+from database.connection_pool import ConnectionPool
 
-def init_database():
-    """Initialize the SQLite database with required tables"""
-    try:
-        # Ensure data directory exists
-        project_root = Path(__file__).parent.parent
-        data_dir = project_root / "data"
-        data_dir.mkdir(exist_ok=True)
-        db_path = data_dir / "courses.db"
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Drop existing tables to reset schema
-        cursor.execute('DROP TABLE IF EXISTS cart')
-        cursor.execute('DROP TABLE IF EXISTS course_sessions')
-        cursor.execute('DROP TABLE IF EXISTS courses')
-
-#___________________Course Search Info_______________________
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS courses (
+#___________________Table definitions_______________________
+# {table} is filled in so a table can also be rebuilt under a temporary name
+TABLES = {
+    'courses': '''
+        CREATE TABLE IF NOT EXISTS {table} (
             course_code TEXT PRIMARY KEY,
             name TEXT NOT NULL,
             credit INTEGER NOT NULL,
             instructor TEXT NOT NULL DEFAULT 'STAFF'
         )
-        ''')
-
-        # Create course_sessions table (session details)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS course_sessions (
+    ''',
+    'course_sessions': '''
+        CREATE TABLE IF NOT EXISTS {table} (
             session_id INTEGER PRIMARY KEY AUTOINCREMENT,
             course_code TEXT,
             name TEXT NOT NULL,
@@ -44,111 +30,256 @@ def init_database():
             end_time TEXT NOT NULL CHECK (end_time LIKE '__:__'),
             instructor TEXT NOT NULL DEFAULT 'STAFF',
             remarks TEXT NOT NULL DEFAULT 'NONE',
-            FOREIGN KEY (course_code) REFERENCES courses (code)
+            FOREIGN KEY (course_code) REFERENCES courses (course_code)
         )
-        ''')
-# ___________________Cart Info_______________________
-        # Create cart table (stores selected courses)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS cart (
-            course_code TEXT,
-            FOREIGN KEY (course_code) REFERENCES courses (code)
+    ''',
+    'cart': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            course_code TEXT PRIMARY KEY,
+            FOREIGN KEY (course_code) REFERENCES courses (course_code)
+        )
+    ''',
+    # Catalog data version, bumped whenever the course catalog is replaced
+    'catalog_meta': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''',
+    'programs': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            program_code TEXT PRIMARY KEY,
+            program_name TEXT NOT NULL,
+            description TEXT
         )
+    ''',
+    'program_majors': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_code TEXT NOT NULL,
+            major_code TEXT NOT NULL,
+            major_name TEXT NOT NULL,
+            FOREIGN KEY (program_code) REFERENCES programs (program_code),
+            UNIQUE (program_code, major_code)
+        )
+    ''',
+    'course_groups': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_name TEXT NOT NULL CHECK (
+                group_name IN (
+                    'University Core',
+                    '1st Major Required',
+                    '1st Major Elective',
+                    '2nd Major Required',
+                    '2nd Major Elective'
+                )
+            )
+        )
+    ''',
+    'major_requirements': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_code TEXT NOT NULL,
+            major_code TEXT NOT NULL,
+            group_id INTEGER NOT NULL,
+            course_code TEXT NOT NULL,
+            campus TEXT NOT NULL CHECK (campus IN ('HK', 'SZ')),
+            FOREIGN KEY (program_code) REFERENCES programs (program_code),
+            FOREIGN KEY (group_id) REFERENCES course_groups (group_id)
+        )
+    ''',
+    'course_equivalences': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sz_code TEXT NOT NULL,
+            hk_code TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            credits INTEGER NOT NULL,
+            description TEXT,
+            UNIQUE (sz_code, hk_code)
+        )
+    ''',
+}
+
+INDEXES = [
+    # Session lookups and the course -> sessions join, already in display order
+    '''CREATE INDEX IF NOT EXISTS idx_course_sessions_course
+       ON course_sessions (course_code, day, start_time)''',
+    # sz_code is the leading column of UNIQUE (sz_code, hk_code); hk_code needs its own
+    '''CREATE INDEX IF NOT EXISTS idx_course_equivalences_hk
+       ON course_equivalences (hk_code)''',
+    # Covers the group and course lookups for a program/major
+    '''CREATE INDEX IF NOT EXISTS idx_major_requirements_major
+       ON major_requirements (program_code, major_code, group_id, course_code, campus)''',
+]
+
+
+def create_indexes(cursor):
+    """Create the indexes behind the hot queries in DatabaseManager"""
+    for statement in INDEXES:
+        cursor.execute(statement)
+
+
+# One row per course; session venues and remarks are folded in so any of them can
+# match. Only the course-level instructor is indexed, as that is the one shown.
+SEARCH_INDEX_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5(
+        course_code, name, instructor, venue, remarks,
+        tokenize = 'trigram'
+    )
+'''
+SEARCH_INDEX_FILL = '''
+    INSERT INTO course_search (course_code, name, instructor, venue, remarks)
+    SELECT
+        c.course_code,
+        c.name,
+        c.instructor,
+        COALESCE(GROUP_CONCAT(DISTINCT cs.venue), ''),
+        COALESCE(GROUP_CONCAT(DISTINCT cs.remarks), '')
+    FROM courses c
+    LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
+    GROUP BY c.course_code
+'''
+
+
+def has_search_index(cursor) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'course_search'")
+    return cursor.fetchone() is not None
+
+
+def rebuild_search_index(cursor):
+    """Refill the full-text index from courses; call inside the import transaction"""
+    if not has_search_index(cursor):
+        return
+    cursor.execute('DELETE FROM course_search')
+    cursor.execute(SEARCH_INDEX_FILL)
+
+
+def _columns(cursor, table):
+    return [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+
+
+def _rebuild_table(cursor, table, select_sql):
+    """Recreate ``table`` from its current definition, copying rows with ``select_sql``"""
+    temp = f'{table}_new'
+    cursor.execute(f'DROP TABLE IF EXISTS {temp}')
+    cursor.execute(TABLES[table].format(table=temp))
+    cursor.execute(f'INSERT INTO {temp} {select_sql}')
+    cursor.execute(f'DROP TABLE {table}')
+    cursor.execute(f'ALTER TABLE {temp} RENAME TO {table}')
+    logging.info(f"Rebuilt table {table}")
+
+#___________________Migrations_______________________
+# MIGRATIONS[n] upgrades a database from user_version n to n + 1
+
+def _migrate_base_schema(cursor):
+    """Create every table and seed a sample course into an empty catalog"""
+    for table, statement in TABLES.items():
+        cursor.execute(statement.format(table=table))
+
+    cursor.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('catalog_version', 1)")
+
+    cursor.execute('SELECT COUNT(*) FROM courses')
+    if cursor.fetchone()[0] == 0:
+        cursor.execute('''
+        INSERT INTO courses (course_code, name, credit, instructor)
+        VALUES (?, ?, ?, ?)
+        ''', ("TEST404 A", "Lecture Test 01", 3, "Prof Eggyolk"))
+        cursor.execute('''
+        INSERT INTO course_sessions (course_code, name, type, day, venue, credit, start_time, end_time, instructor, remarks)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', ("TEST404 A", "Lecture Test 01", "Lec", 0, "TA101", 3, "10:00", "11:30", "Prof Eggyolk", "None"))
+
+
+def _migrate_fix_keys(cursor):
+    """Upgrade tables created by older builds to the current keys"""
+    # Older builds pointed the foreign key at a non-existent courses(code)
+    if any(row[4] == 'code' for row in cursor.execute('PRAGMA foreign_key_list(course_sessions)')):
+        columns = ', '.join(_columns(cursor, 'course_sessions'))
+        _rebuild_table(cursor, 'course_sessions', f'({columns}) SELECT {columns} FROM course_sessions')
+
+    # ... and left the cart without a key, so duplicates could pile up
+    if not any(row[5] for row in cursor.execute('PRAGMA table_info(cart)')):
+        _rebuild_table(cursor, 'cart', '''
+            (course_code) SELECT DISTINCT course_code FROM cart WHERE course_code IS NOT NULL
         ''')
 
-        # Insert sample data if tables are empty
-        cursor.execute('SELECT COUNT(*) FROM courses')
-        if cursor.fetchone()[0] == 0:
-            # Insert courses
-            sample_courses = [
-                ("TEST404 A", "Lecture Test 01", 3, "Prof Eggyolk"),
-            ]
-            cursor.executemany('''
-            INSERT INTO courses (course_code, name, credit, instructor)
-            VALUES (?, ?, ?, ?)
-            ''', sample_courses)
-
-            # Insert course sessions
-            sample_sessions = [
-                ("TEST404 A", "Lecture Test 01", "Lec", 0, "TA101", 3, "10:00", "11:30", "Prof Eggyolk","None"),
-
-            ]
-            cursor.executemany('''
-            INSERT INTO course_sessions (course_code, name, type, day, venue, credit, start_time, end_time, instructor, remarks)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', sample_sessions)
-
-# ___________________Course Trans Info_______________________
-
-            # Create programs table
-            cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS programs (
-                        program_code TEXT PRIMARY KEY,
-                        program_name TEXT NOT NULL,
-                        description TEXT
-                    )
-                    ''')
-
-            # Create program_majors table
-            cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS program_majors (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        program_code TEXT NOT NULL,
-                        major_code TEXT NOT NULL,
-                        major_name TEXT NOT NULL,
-                        FOREIGN KEY (program_code) REFERENCES programs (program_code),
-                        UNIQUE (program_code, major_code)
-                    )
-                    ''')
-
-            # Create course_groups table
-            cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS course_groups (
-                        group_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        group_name TEXT NOT NULL CHECK (
-                            group_name IN (
-                                'University Core',
-                                '1st Major Required',
-                                '1st Major Elective',
-                                '2nd Major Required',
-                                '2nd Major Elective'
-                            )
-                        )
-                    )
-                    ''')
-
-            # Create major_requirements table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS major_requirements (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    program_code TEXT NOT NULL,
-                    major_code TEXT NOT NULL,
-                    group_name TEXT NOT NULL,
-                    course_code TEXT NOT NULL,
-                    campus TEXT NOT NULL CHECK (campus IN ('HK', 'SZ')),
-                    FOREIGN KEY (program_code) REFERENCES programs (program_code)
-                )
-            ''')
-
-            # Create course_equivalences table
-            cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS course_equivalences (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        sz_code TEXT NOT NULL,
-                        hk_code TEXT NOT NULL,
-                        course_name TEXT NOT NULL,
-                        credits INTEGER NOT NULL,
-                        description TEXT,
-                        UNIQUE (sz_code, hk_code)
-                    )
-                    ''')
-
-        conn.commit()
-        conn.close()
-
-        logging.info("Database initialized successfully")
+    # ... and stored major_requirements by group name instead of group_id
+    if 'group_name' in _columns(cursor, 'major_requirements'):
+        _rebuild_table(cursor, 'major_requirements', '''
+            (id, program_code, major_code, group_id, course_code, campus)
+            SELECT mr.id, mr.program_code, mr.major_code, cg.group_id, mr.course_code, mr.campus
+            FROM major_requirements mr
+            JOIN course_groups cg ON cg.group_name = mr.group_name
+        ''')
+
+
+def _migrate_search_index(cursor):
+    """Add the FTS5 trigram index used by course search"""
+    try:
+        cursor.execute(SEARCH_INDEX_TABLE)
+    except sqlite3.OperationalError as e:
+        # SQLite older than 3.34 has no trigram tokenizer; search keeps using LIKE
+        logging.warning(f"Full-text search unavailable: {str(e)}")
+        return
+    rebuild_search_index(cursor)
+
+
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_fix_keys,
+    create_indexes,
+    _migrate_search_index,
+    rebuild_search_index,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn) -> int:
+    """Apply pending migrations, each in its own transaction; returns the new version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version > SCHEMA_VERSION:
+        logging.warning(f"Database schema v{version} is newer than this build (v{SCHEMA_VERSION})")
+        return version
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            MIGRATIONS[target - 1](cursor)
+            cursor.execute(f'PRAGMA user_version = {target}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        logging.info(f"Migrated database schema to v{target}")
+    return SCHEMA_VERSION
+
+
+def init_database():
+    """Bring the SQLite database up to the current schema version.
+
+    A no-op apart from the version check when the schema is current, so the
+    imported catalog and the cart survive restarts.
+    """
+    try:
+        # Ensure data directory exists
+        project_root = Path(__file__).parent.parent
+        data_dir = project_root / "data"
+        data_dir.mkdir(exist_ok=True)
+        db_path = data_dir / "courses.db"
+        conn = sqlite3.connect(db_path)
+        try:
+            # journal_mode=WAL is persistent, so this also switches the file over
+            ConnectionPool.apply_pragmas(conn, DB_PRAGMAS)
+            version = migrate(conn)
+        finally:
+            conn.close()
+
+        logging.info(f"Database initialized successfully (schema v{version})")
         return True
 
     except sqlite3.Error as e:
         logging.error(f"Database initialization error: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -1,12 +1,20 @@
 # database/db_manager.py
 import sqlite3
 import os
+import re
 from typing import List, Dict
 import logging
+import threading
+import functools
+import itertools
+from collections import OrderedDict
 from contextlib import contextmanager
-import pandas as pd
 import sys
 import os
+from database.connection_pool import ConnectionPool, SnapshotPool
+from config import CATALOG_SNAPSHOT, QUERY_CACHE_SIZE, COURSE_PAGE_SIZE, IMPORT_BATCH_SIZE
+from database.db_init import TABLES, has_search_index, rebuild_search_index
+from database.import_session import ImportSession, ImportCancelled
 
 def resource_path(relative_path):
     """Get absolute path to resource"""
@@ -17,27 +25,324 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def _frame_rows(frame):
+    """DataFrame rows as tuples of plain Python values, ready for executemany"""
+    return zip(*(frame[column].tolist() for column in frame.columns))
+
+
+def cached_query(method):
+    """Serve repeated calls from DatabaseManager's LRU result cache.
+
+    Entries are keyed by method, arguments and the data version current when
+    the call started, so any write that bumps the version makes them
+    unreachable. Error replies ({'success': False, ...}) are not cached.
+    Cached results are shared between callers and must not be mutated.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())), self.data_version)
+        with self._cache_lock:
+            if key in self._result_cache:
+                self._result_cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._result_cache[key]
+            self.cache_misses += 1
+
+        result = method(self, *args, **kwargs)
+        if isinstance(result, dict) and result.get('success') is False:
+            return result
+        with self._cache_lock:
+            self._result_cache[key] = result
+            while len(self._result_cache) > self.cache_size:
+                self._result_cache.popitem(last=False)
+        return result
+    return wrapper
+
+
 class DatabaseManager:
-    def __init__(self):
+    #_________________Hot queries; check_query_plans() verifies each one is index-backed_________________
+    COURSE_COLUMNS_SQL = '''
+        c.course_code,
+        c.name,
+        cs.type,
+        cs.day,
+        cs.venue,
+        c.credit,
+        cs.start_time,
+        cs.end_time,
+        c.instructor,
+        cs.remarks
+    '''
+    SEARCH_COURSES_SQL = f'''
+        SELECT {COURSE_COLUMNS_SQL}
+        FROM courses c
+        LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
+        WHERE c.course_code LIKE ? OR c.name LIKE ?
+        ORDER BY c.course_code, cs.day, cs.start_time
+    '''
+    # Full-text hits ranked course-code prefix matches first, then by BM25
+    # (column weights: code, name, instructor, venue, remarks)
+    FTS_SEARCH_COURSES_SQL = f'''
+        WITH hits AS MATERIALIZED (
+            SELECT
+                course_code,
+                course_code LIKE ? ESCAPE '\\' AS code_prefix,
+                bm25(course_search, 10.0, 5.0, 2.0, 1.0, 0.5) AS score
+            FROM course_search
+            WHERE course_search MATCH ?
+        )
+        SELECT {COURSE_COLUMNS_SQL}
+        FROM hits
+        JOIN courses c ON c.course_code = hits.course_code
+        LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
+        ORDER BY hits.code_prefix DESC, hits.score, c.course_code, cs.day, cs.start_time
+    '''
+    FTS_MIN_QUERY_LENGTH = 3  # the trigram tokenizer cannot match anything shorter
+    # Result fields each search mode matches against, for in-memory refinement
+    SEARCH_FIELDS = {
+        'fts': ('course_code', 'name', 'instructor', 'venue', 'remarks'),
+        'like': ('course_code', 'name'),
+    }
+    ALL_COURSES_SQL = f'''
+        SELECT {COURSE_COLUMNS_SQL}
+        FROM courses c
+        LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
+        ORDER BY c.course_code, cs.day, cs.start_time
+    '''
+    # Keyset pagination: the next ``limit`` course codes after the last one shown
+    COURSE_PAGE_SQL = f'''
+        WITH page AS (
+            SELECT course_code FROM courses
+            WHERE course_code > ?
+            ORDER BY course_code
+            LIMIT ?
+        )
+        SELECT {COURSE_COLUMNS_SQL}
+        FROM page
+        JOIN courses c ON c.course_code = page.course_code
+        LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
+        ORDER BY c.course_code, cs.day, cs.start_time
+    '''
+    # CROSS JOIN pins the (small) cart as the outer loop
+    CART_COURSES_SQL = f'''
+        SELECT {COURSE_COLUMNS_SQL}
+        FROM cart ct
+        CROSS JOIN courses c ON c.course_code = ct.course_code
+        CROSS JOIN course_sessions cs ON c.course_code = cs.course_code
+        ORDER BY c.course_code, cs.day, cs.start_time
+    '''
+    CART_SESSIONS_SQL = '''
+        SELECT cs.course_code, cs.name, cs.day, cs.start_time, cs.end_time, cs.type
+        FROM cart ct
+        CROSS JOIN course_sessions cs ON cs.course_code = ct.course_code
+    '''
+    COURSE_SESSIONS_SQL = '''
+        SELECT cs.course_code, cs.name, cs.day, cs.start_time, cs.end_time, cs.type
+        FROM course_sessions cs
+        WHERE cs.course_code = ?
+    '''
+    IN_CART_SQL = 'SELECT 1 FROM cart WHERE course_code = ?'
+    MAJORS_SQL = '''
+        SELECT major_code, major_name
+        FROM program_majors
+        WHERE program_code = ?
+    '''
+    GROUPS_SQL = '''
+        SELECT DISTINCT g.group_id, g.group_name
+        FROM course_groups g
+        JOIN major_requirements mr ON g.group_id = mr.group_id
+        WHERE mr.program_code = ? AND mr.major_code = ?
+    '''
+    GROUP_COURSES_SQL = '''
+        SELECT DISTINCT mr.course_code, ce.course_name
+        FROM major_requirements mr
+        JOIN course_equivalences ce ON mr.course_code = ce.sz_code
+        WHERE mr.program_code = ? AND mr.major_code = ? AND mr.group_id = ?
+    '''
+    EQUIVALENCE_SQL = '''
+        SELECT sz_code, hk_code, course_name, credits, description
+        FROM course_equivalences
+        WHERE sz_code = ? OR hk_code = ?
+    '''
+    FILTERED_COURSES_SQL = '''
+        SELECT DISTINCT mr.course_code, mr.campus
+        FROM major_requirements mr
+        WHERE mr.group_id = (SELECT group_id FROM course_groups WHERE group_name = ?)
+        AND mr.program_code = ?
+        AND mr.major_code = ?
+    '''
+
+    # name -> (sql, sample parameters, tables that may legitimately be scanned)
+    QUERY_PLAN_CHECKS = {
+        # A LIKE with a leading wildcard has to read every course
+        'search_courses': (SEARCH_COURSES_SQL, ('%a%', '%a%'), ('c',)),
+        # The FTS index and the handful of rows it matched
+        'search_courses_fts': (FTS_SEARCH_COURSES_SQL, ('abc%', '"abc"'), ('course_search', 'hits')),
+        # Returns the whole catalog
+        'get_all_courses': (ALL_COURSES_SQL, (), ('c',)),
+        # The page of course codes picked by the keyset search
+        'iter_courses': (COURSE_PAGE_SQL, ('', COURSE_PAGE_SIZE), ('page',)),
+        # The cart itself, a handful of rows
+        'get_cart_courses': (CART_COURSES_SQL, (), ('ct',)),
+        'cart_sessions': (CART_SESSIONS_SQL, (), ('ct',)),
+        'course_sessions': (COURSE_SESSIONS_SQL, ('',), ()),
+        'is_in_cart': (IN_CART_SQL, ('',), ()),
+        'get_majors_for_program': (MAJORS_SQL, ('',), ()),
+        'get_groups_for_major': (GROUPS_SQL, ('', ''), ()),
+        'get_courses_for_group': (GROUP_COURSES_SQL, ('', '', 0), ()),
+        'get_course_equivalence': (EQUIVALENCE_SQL, ('', ''), ()),
+        # course_groups is a five-row lookup table
+        'get_filtered_courses': (FILTERED_COURSES_SQL + ' AND mr.campus = ?', ('', '', '', 'HK'), ('course_groups',)),
+    }
+
+    def __init__(self, pool: ConnectionPool = None, snapshot: bool = CATALOG_SNAPSHOT,
+                 cache_size: int = QUERY_CACHE_SIZE):
         self.db_path = resource_path(os.path.join('data', 'courses.db'))
 
         if not os.path.exists(self.db_path):
             logging.error(f"Database file not found at: {self.db_path}")
             raise FileNotFoundError(f"Database file not found at: {self.db_path}")
 
+        self.pool = pool or ConnectionPool(self.db_path)
+        self._last_search = None  # (query, mode, results) for refinement
+        self.snapshot = SnapshotPool(self.pool) if snapshot else None
+
+        # Result cache for @cached_query methods; bump_data_version() invalidates it
+        self.data_version = 0
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._result_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        with self.get_connection() as conn:
+            self.full_text_search = has_search_index(conn.cursor())
+        if not self.full_text_search:
+            logging.warning("Course search index missing, falling back to LIKE search")
+        if self.snapshot is not None:
+            # Load the shared copy up front rather than on the first search
+            self.snapshot.connection()
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = None
+        """Context manager for the calling thread's pooled connection"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            yield conn
+            with self.pool.session() as conn:
+                yield conn
         except sqlite3.Error as e:
             logging.error(f"Database connection error: {str(e)}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    @contextmanager
+    def read_connection(self):
+        """Connection for catalog reads: the in-memory snapshot when enabled.
+
+        The cart is written to disk, so anything reading it keeps using
+        get_connection().
+        """
+        if self.snapshot is None:
+            with self.get_connection() as conn:
+                yield conn
+            return
+        try:
+            with self.snapshot.session() as conn:
+                yield conn
+        except sqlite3.Error as e:
+            logging.error(f"Database snapshot error: {str(e)}")
+            raise
+
+    def bump_data_version(self):
+        """Invalidate cached query results after a write to the catalog or cart"""
+        with self._cache_lock:
+            self.data_version += 1
+            self._result_cache.clear()
+
+    def cache_stats(self) -> Dict:
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'entries': len(self._result_cache),
+                'data_version': self.data_version,
+            }
+
+    def refresh_snapshot(self):
+        """Reload the in-memory catalog on each thread's next read"""
+        if self.snapshot is not None:
+            self.snapshot.refresh()
+
+    def release_connections(self):
+        """Close the calling thread's connections, e.g. before a worker thread exits"""
+        self.pool.release()
+        if self.snapshot is not None:
+            self.snapshot.release()
+
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close_all()
+        self.pool.close_all()
+
+    def get_catalog_version(self) -> int:
+        """Current catalog data version; changes whenever courses are re-imported"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT value FROM catalog_meta WHERE key = 'catalog_version'")
+                row = cursor.fetchone()
+                return row[0] if row else 0
+        except sqlite3.Error as e:
+            logging.error(f"Error reading catalog version: {str(e)}")
+            return 0
+
+    def _bump_catalog_version(self, cursor):
+        cursor.execute('''
+            INSERT INTO catalog_meta (key, value) VALUES ('catalog_version', 1)
+            ON CONFLICT (key) DO UPDATE SET value = value + 1
+        ''')
+
+    def check_query_plans(self) -> Dict[str, Dict]:
+        """Run EXPLAIN QUERY PLAN over the hot queries.
+
+        A query passes when every table it touches is searched through an
+        index, apart from the ones it is expected to scan. Returns
+        {name: {'plan': [...], 'full_scans': [...], 'uses_index': bool}}.
+        The FTS query is skipped when the search index is missing.
+        """
+        report = {}
+        with self.get_connection() as conn:
+            for name, (sql, params, allowed_scans) in self.QUERY_PLAN_CHECKS.items():
+                if name == 'search_courses_fts' and not self.full_text_search:
+                    continue
+                plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+                full_scans = self._full_scans(plan, allowed_scans)
+                report[name] = {'plan': plan, 'full_scans': full_scans, 'uses_index': not full_scans}
+                if full_scans:
+                    logging.warning(f"Query {name} scans without an index: {full_scans}")
+        return report
+
+    # "SEARCH c USING INDEX ...", "SCAN TABLE courses AS c USING INDEX ..." (older SQLite)
+    _PLAN_TABLE_ACCESS = re.compile(r'^(SCAN|SEARCH) (?!CONSTANT ROW)(?:TABLE )?(\S+)(?: AS (\S+))?(.*)$')
+    _INDEX_SEARCH = re.compile(r'^ USING (?:COVERING INDEX|INDEX|INTEGER PRIMARY KEY|PRIMARY KEY)\b')
+
+    @classmethod
+    def _full_scans(cls, plan: List[str], allowed_scans) -> List[str]:
+        """Plan lines that read a table other than by an index search.
+
+        Only SEARCH through an index or the rowid counts as index-backed: a
+        SCAN walks the whole table even when it does so USING INDEX, and an
+        AUTOMATIC index is rebuilt on every run. Tables in ``allowed_scans``
+        (matched by alias) are let through.
+        """
+        full_scans = []
+        for detail in plan:
+            match = cls._PLAN_TABLE_ACCESS.match(detail)
+            if match is None:
+                continue
+            operation, table, alias, rest = match.groups()
+            if (alias or table) in allowed_scans:
+                continue
+            if operation == 'SCAN' or not cls._INDEX_SEARCH.match(rest):
+                full_scans.append(detail)
+        return full_scans
 
 #_________________formating________________________
     def _is_valid_time(self, time_str):
@@ -66,239 +371,213 @@ class DatabaseManager:
             if not os.path.isabs(file_path):
                 file_path = resource_path(file_path)
 
-            file_extension = file_path.lower().split('.')[-1]
-
-            if file_extension not in ['csv', 'xlsx', 'xls']:
-                return False, "Unsupported file format"
-
-            if file_extension == 'csv':
-                df = pd.read_csv(file_path)
-                # Check if it's a course file
-                required_columns = ['course_code', 'name', 'type', 'day', 'venue', 'credit',
-                                    'start_time', 'end_time', 'instructor', 'remarks']
-                missing_columns = [col for col in required_columns if col not in df.columns]
-                if missing_columns:
-                    return False, f"Missing required columns: {', '.join(missing_columns)}"
-                return True, "Valid course file"
-            else:
-                # Excel file - check for translation data sheets
-                xls = pd.ExcelFile(file_path)
-                translation_sheets = ['Programs', 'Program_Majors', 'Course_Groups',
-                                      'Major_Requirements', 'Course_Equivalences']
-
-                if all(sheet in xls.sheet_names for sheet in translation_sheets):
-                    return True, "Valid translation file"
-
-            return False, "Invalid file format or missing required columns/sheets"
+            return ImportSession(file_path).validate()
 
         except Exception as e:
             return False, f"Error validating file: {str(e)}"
 
 #_________________CSV import_______________________________________
 
+    def _executemany_batched(self, cursor, sql: str, rows, batch_size: int = IMPORT_BATCH_SIZE,
+                             on_batch=None) -> int:
+        """executemany over ``rows`` in chunks of ``batch_size``; returns the row count.
+
+        ``on_batch(rows_so_far)`` runs after each chunk and may raise to abort.
+        """
+        rows = iter(rows)
+        total = 0
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return total
+            cursor.executemany(sql, batch)
+            total += len(batch)
+            if on_batch is not None:
+                on_batch(total)
+
+    @staticmethod
+    def _import_checkpoint(rows_done, total_rows, progress, should_stop):
+        """Report import progress and raise ImportCancelled if asked to stop"""
+        if should_stop is not None and should_stop():
+            raise ImportCancelled()
+        if progress is not None:
+            progress(rows_done, total_rows)
+
     def import_courses_from_file(self, file_path: str) -> int:
         """Import courses from file"""
-        file_extension = file_path.lower().split('.')[-1]
+        return self.import_session(ImportSession(file_path))
 
-        # Check if it's a translation data file
-        if file_extension in ['xlsx', 'xls']:
-            xls = pd.ExcelFile(file_path)
-            translation_sheets = ['Programs', 'Program_Majors', 'Course_Groups',
-                                  'Major_Requirements', 'Course_Equivalences']
-            if all(sheet in xls.sheet_names for sheet in translation_sheets):
-                return self.import_translation_data(file_path)
+    def import_session(self, session: ImportSession, progress=None, should_stop=None) -> int:
+        """Import an already parsed file; translation workbooks go to import_translation_data.
+
+        ``progress(rows_done, total_rows)`` is called as rows are written and
+        ``should_stop()`` polled at the same points; when it returns True the
+        import is rolled back and ImportCancelled raised. ``total_rows`` is
+        None when the file's size is unknown.
+        """
+        if session.kind == 'translation':
+            return self._import_translation_session(session, progress, should_stop)
 
         try:
-            # Read the file
-            if file_extension == 'csv':
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+            if session.error:
+                raise ValueError(session.error)
 
-            with self.get_connection() as conn:
+            with self.pool.profile('bulk_import'), self.get_connection() as conn:
                 cursor = conn.cursor()
+                self._create_import_staging(cursor)
+                conn.commit()
 
-                # Clear existing data
+                # Each chunk is validated and committed into the staging tables, so
+                # only one chunk is ever held in memory and the live catalog is
+                # untouched until the swap below
+                courses_added = 0
+                for courses, sessions in session.iter_course_chunks():
+                    # The first session of a course code wins, as before chunking
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO courses_staging
+                        (course_code, name, credit, instructor)
+                        VALUES (?, ?, ?, ?)
+                    ''', _frame_rows(courses))
+                    cursor.executemany('''
+                        INSERT INTO course_sessions_staging
+                        (course_code, name, type, day, venue, credit,
+                         start_time, end_time, instructor, remarks)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', _frame_rows(sessions))
+                    conn.commit()
+                    courses_added += len(sessions)
+                    self._import_checkpoint(session.rows_read, session.total_rows, progress, should_stop)
+
+                for line, course_code, reason in session.errors:
+                    logging.error(f"Skipped row {line} ({course_code}): {reason}")
+                if session.rejected_count:
+                    logging.warning(f"Skipped {session.rejected_count} invalid course rows")
+
+                # Swap the staged catalog in with a single transaction
                 cursor.execute('DELETE FROM course_sessions')
                 cursor.execute('DELETE FROM courses')
+                cursor.execute('INSERT INTO courses SELECT * FROM courses_staging')
+                cursor.execute('INSERT INTO course_sessions SELECT * FROM course_sessions_staging')
+                self._drop_import_staging(cursor)
 
-                courses_added = 0
-                processed_courses = set()
-
-                for _, row in df.iterrows():
-                    try:
-                        # Use full course code including type
-                        full_course_code = str(row['course_code'])  # e.g., "CS101 A LEC" or "CS101 A TUT"
-
-                        # Insert base course if not exists
-                        if full_course_code not in processed_courses:
-                            cursor.execute('''
-                                INSERT INTO courses 
-                                (course_code, name, credit, instructor) 
-                                VALUES (?, ?, ?, ?)
-                            ''', (
-                                full_course_code,
-                                str(row['name']),
-                                int(row['credit']),
-                                str(row['instructor'])
-                            ))
-                            processed_courses.add(full_course_code)
-
-                        # Insert session
-                        cursor.execute('''
-                            INSERT INTO course_sessions 
-                            (course_code, name, type, day, venue, credit, 
-                             start_time, end_time, instructor, remarks) 
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            full_course_code,
-                            str(row['name']),
-                            str(row['type']),
-                            int(row['day']),
-                            str(row['venue']),
-                            int(row['credit']),
-                            str(row['start_time']),
-                            str(row['end_time']),
-                            str(row['instructor']),
-                            str(row.get('remarks', 'None'))
-                        ))
-                        courses_added += 1
-                        logging.info(f"Added course session: {full_course_code}")
-
-                    except Exception as e:
-                        logging.error(f"Error processing course {row.get('course_code', 'Unknown')}: {str(e)}")
-                        continue
-
+                rebuild_search_index(cursor)
+                self._bump_catalog_version(cursor)
                 conn.commit()
+                self._last_search = None
+                self.refresh_snapshot()
+                self.bump_data_version()
                 logging.info(f"Successfully imported {courses_added} course sessions")
                 return courses_added
 
+        except ImportCancelled:
+            logging.info("Course import cancelled; the current catalog was kept")
+            self._discard_import_staging()
+            raise
         except Exception as e:
             logging.error(f"Error importing courses: {str(e)}")
+            self._discard_import_staging()
             return 0
 
+    IMPORT_STAGING_TABLES = {'courses': 'courses_staging', 'course_sessions': 'course_sessions_staging'}
+
+    def _create_import_staging(self, cursor):
+        """Fresh staging copies of the catalog tables for a chunked import"""
+        self._drop_import_staging(cursor)
+        for table, staging in self.IMPORT_STAGING_TABLES.items():
+            cursor.execute(TABLES[table].format(table=staging))
+
+    def _drop_import_staging(self, cursor):
+        for staging in self.IMPORT_STAGING_TABLES.values():
+            cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+
+    def _discard_import_staging(self):
+        """Drop what an aborted import committed to the staging tables"""
+        try:
+            with self.get_connection() as conn:
+                self._drop_import_staging(conn.cursor())
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error dropping import staging tables: {str(e)}")
+
+    # Sheet, table, columns and insert statement for each part of the translation
+    # workbook, in dependency order (major_requirements looks up course_groups)
+    TRANSLATION_SHEETS = [
+        ('Programs', 'programs', ['program_code', 'program_name', 'description'], '''
+            INSERT INTO programs (program_code, program_name, description)
+            VALUES (?, ?, ?)
+        '''),
+        ('Program_Majors', 'program_majors', ['program_code', 'major_code', 'major_name'], '''
+            INSERT INTO program_majors (program_code, major_code, major_name)
+            VALUES (?, ?, ?)
+        '''),
+        ('Course_Groups', 'course_groups', ['group_name'], '''
+            INSERT INTO course_groups (group_name)
+            VALUES (?)
+        '''),
+        ('Major_Requirements', 'major_requirements', ['program_code', 'major_code', 'group_name', 'course_code', 'campus'], '''
+            INSERT INTO major_requirements 
+            (program_code, major_code, group_id, course_code, campus)
+            VALUES (?, ?, 
+                (SELECT group_id FROM course_groups WHERE group_name = ?), 
+                ?, ?)
+        '''),
+        ('Course_Equivalences', 'course_equivalences', ['sz_code', 'hk_code', 'course_name', 'credits', 'description'], '''
+            INSERT INTO course_equivalences 
+            (sz_code, hk_code, course_name, credits, description)
+            VALUES (?, ?, ?, ?, ?)
+        '''),
+    ]
+
     def import_translation_data(self, file_path: str) -> int:
         """Import translation data from Excel file"""
+        return self._import_translation_session(ImportSession(file_path))
+
+    def _import_translation_session(self, session: ImportSession, progress=None, should_stop=None) -> int:
         conn = None
         cursor = None
         try:
-            xls = pd.ExcelFile(file_path)
-            conn = sqlite3.connect(self.db_path)
+            if session.error:
+                raise ValueError(session.error)
+            conn = self.pool.connection()
+            self.pool.apply_profile('bulk_import')
             cursor = conn.cursor()
 
             # Begin transaction
             cursor.execute("BEGIN TRANSACTION")
 
             try:
-                # Import Programs
-                df_programs = pd.read_excel(xls, 'Programs')
-                # Clean data by splitting on comma if needed
-                if isinstance(df_programs.columns[0], str) and ',' in df_programs.columns[0]:
-                    df_programs = pd.read_excel(xls, 'Programs', header=None)
-                    headers = df_programs.iloc[0].str.split(',').iloc[0]
-                    df_programs = pd.DataFrame([x.split(',') for x in df_programs.iloc[1:, 0]], columns=headers)
-
-                logging.info(f"Programs data preview:\n{df_programs.head()}")
-                cursor.execute('DELETE FROM programs')
-                for _, row in df_programs.iterrows():
-                    cursor.execute('''
-                        INSERT INTO programs (program_code, program_name, description)
-                        VALUES (?, ?, ?)
-                    ''', (row['program_code'].strip(),
-                          row['program_name'].strip(),
-                          row['description'].strip()))
-
-                # Import Program Majors
-                df_majors = pd.read_excel(xls, 'Program_Majors')
-                if isinstance(df_majors.columns[0], str) and ',' in df_majors.columns[0]:
-                    df_majors = pd.read_excel(xls, 'Program_Majors', header=None)
-                    headers = df_majors.iloc[0].str.split(',').iloc[0]
-                    df_majors = pd.DataFrame([x.split(',') for x in df_majors.iloc[1:, 0]], columns=headers)
-
-                logging.info(f"Program Majors data preview:\n{df_majors.head()}")
-                cursor.execute('DELETE FROM program_majors')
-                for _, row in df_majors.iterrows():
-                    cursor.execute('''
-                        INSERT INTO program_majors (program_code, major_code, major_name)
-                        VALUES (?, ?, ?)
-                    ''', (row['program_code'].strip(),
-                          row['major_code'].strip(),
-                          row['major_name'].strip()))
-
-                # Import Course Groups
-                df_groups = pd.read_excel(xls, 'Course_Groups')
-                if isinstance(df_groups.columns[0], str) and ',' in df_groups.columns[0]:
-                    df_groups = pd.read_excel(xls, 'Course_Groups', header=None)
-                    headers = df_groups.iloc[0].str.split(',').iloc[0]
-                    df_groups = pd.DataFrame([x.split(',') for x in df_groups.iloc[1:, 0]], columns=headers)
-
-                logging.info(f"Course Groups data preview:\n{df_groups.head()}")
-                cursor.execute('DELETE FROM course_groups')
-                for _, row in df_groups.iterrows():
-                    cursor.execute('''
-                        INSERT INTO course_groups (group_name)
-                        VALUES (?)
-                    ''', (row['group_name'].strip(),))
-
-                # Import Major Requirements
-                df_requirements = pd.read_excel(xls, 'Major_Requirements')
-                if isinstance(df_requirements.columns[0], str) and ',' in df_requirements.columns[0]:
-                    df_requirements = pd.read_excel(xls, 'Major_Requirements', header=None)
-                    headers = df_requirements.iloc[0].str.split(',').iloc[0]
-                    df_requirements = pd.DataFrame([x.split(',') for x in df_requirements.iloc[1:, 0]], columns=headers)
-
-                logging.info(f"Major Requirements data preview:\n{df_requirements.head()}")
-                cursor.execute('DELETE FROM major_requirements')
-                for _, row in df_requirements.iterrows():
-                    cursor.execute('''
-                        INSERT INTO major_requirements 
-                        (program_code, major_code, group_id, course_code, campus)
-                        VALUES (?, ?, 
-                            (SELECT group_id FROM course_groups WHERE group_name = ?), 
-                            ?, ?)
-                    ''', (row['program_code'].strip(),
-                          row['major_code'].strip(),
-                          row['group_name'].strip(),
-                          row['course_code'].strip(),
-                          row['campus'].strip()))
-
-                # Import Course Equivalences
-                df_equivalences = pd.read_excel(xls, 'Course_Equivalences')
-                if isinstance(df_equivalences.columns[0], str) and ',' in df_equivalences.columns[0]:
-                    df_equivalences = pd.read_excel(xls, 'Course_Equivalences', header=None)
-                    headers = df_equivalences.iloc[0].str.split(',').iloc[0]
-                    df_equivalences = pd.DataFrame([x.split(',') for x in df_equivalences.iloc[1:, 0]], columns=headers)
-
-                logging.info(f"Course Equivalences data preview:\n{df_equivalences.head()}")
-                cursor.execute('DELETE FROM course_equivalences')
-                for _, row in df_equivalences.iterrows():
-                    cursor.execute('''
-                        INSERT INTO course_equivalences 
-                        (sz_code, hk_code, course_name, credits, description)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (row['sz_code'].strip(),
-                          row['hk_code'].strip(),
-                          row['course_name'].strip(),
-                          float(str(row['credits']).strip()),
-                          row['description'].strip()))
+                total_records = 0
+                with session.workbook():
+                    for sheet, table, columns, insert_sql in self.TRANSLATION_SHEETS:
+                        # Rows stream from the workbook straight into the batched inserts
+                        cursor.execute(f'DELETE FROM {table}')
+                        added = self._executemany_batched(
+                            cursor, insert_sql, session.translation_rows(sheet, columns),
+                            on_batch=lambda count: self._import_checkpoint(
+                                total_records + count, session.total_rows, progress, should_stop)
+                        )
+                        logging.info(f"Imported {added} rows from {sheet}")
+                        total_records += added
 
                 # Commit transaction
                 conn.commit()
+                self.refresh_snapshot()
+                self.bump_data_version()
 
-                # Return total number of records imported
-                total_records = (
-                        len(df_programs) + len(df_majors) + len(df_groups) +
-                        len(df_requirements) + len(df_equivalences)
-                )
                 logging.info(f"Successfully imported {total_records} records")
                 return total_records
 
             except Exception as e:
                 if conn:
                     conn.rollback()
+                if isinstance(e, ImportCancelled):
+                    logging.info("Translation import cancelled; changes rolled back")
+                    raise
                 logging.error(f"Error during import: {str(e)}")
                 raise e
 
+        except ImportCancelled:
+            raise
         except Exception as e:
             logging.error(f"Error importing translation data: {str(e)}")
             raise
@@ -307,32 +586,71 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.pool.apply_profile()
 
 #____________________________________Search___________________________________________________
 
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _search_mode(self, query: str) -> str:
+        if self.full_text_search and len(query) >= self.FTS_MIN_QUERY_LENGTH:
+            return 'fts'
+        return 'like'
+
+    def _refine_last_search(self, query: str, mode: str):
+        """Answer a narrowed query from the previous result set, or return None.
+
+        Valid only when both queries use the same matcher and the new text
+        contains the old one: every match of the new query then already
+        matched the old one, so filtering in memory gives the same courses.
+        """
+        last = self._last_search
+        if last is None:
+            return None
+        last_query, last_mode, last_results = last
+        if mode != last_mode or last_query.lower() not in query.lower():
+            return None  # broadened or switched matcher
+        if mode == 'like' and ('%' in query or '_' in query):
+            return None  # LIKE wildcards have no plain-substring equivalent
+
+        needle = query.lower()
+        fields = self.SEARCH_FIELDS[mode]
+        matched = {
+            row['course_code'] for row in last_results
+            if any(needle in str(row[field] or '').lower() for field in fields)
+        }
+        results = [row for row in last_results if row['course_code'] in matched]
+        if mode == 'fts':
+            # Re-apply the course-code prefix boost; the BM25 order is kept otherwise
+            results.sort(key=lambda row: not row['course_code'].lower().startswith(needle))
+
+        self._last_search = (query, mode, results)
+        return results
+
+    @cached_query
     def search_courses(self, query: str) -> List[Dict]:
-        """Search courses by code, name, or schedule"""
+        """Search courses by code, name, instructor, venue or remarks.
+
+        Queries of three or more characters go through the FTS5 trigram index
+        (substring match, ranked); shorter ones fall back to LIKE on code and name.
+        A query that narrows the previous one is filtered from its results
+        without touching the database.
+        """
+        mode = self._search_mode(query)
+        refined = self._refine_last_search(query, mode)
+        if refined is not None:
+            return refined
+
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT 
-                        c.course_code,
-                        c.name,
-                        cs.type,
-                        cs.day,
-                        cs.venue,
-                        c.credit,
-                        cs.start_time,
-                        cs.end_time,
-                        c.instructor,
-                        cs.remarks
-                    FROM courses c
-                    LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
-                    WHERE c.course_code LIKE ? OR c.name LIKE ?
-                    ORDER BY c.course_code, cs.day, cs.start_time
-                ''', (f'%{query}%', f'%{query}%'))
+                if mode == 'fts':
+                    phrase = '"' + query.replace('"', '""') + '"'
+                    cursor.execute(self.FTS_SEARCH_COURSES_SQL, (self._escape_like(query) + '%', phrase))
+                else:
+                    cursor.execute(self.SEARCH_COURSES_SQL, (f'%{query}%', f'%{query}%'))
 
                 columns = ["course_code", "name", "type", "day", "venue", "credit", "start_time", "end_time", "instructor", "remarks"]
                 results = []
@@ -341,33 +659,20 @@ class DatabaseManager:
                     course_dict = dict(zip(columns, row))
                     results.append(course_dict)
 
+                self._last_search = (query, mode, results)
                 return results
 
         except sqlite3.Error as e:
             logging.error(f"Error searching courses: {str(e)}")
             return []  # 返回空列表
 
+    @cached_query
     def get_all_courses(self) -> List[Dict]:
         """Get all courses with their sessions"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT 
-                        c.course_code,
-                        c.name,
-                        cs.type,
-                        cs.day,
-                        cs.venue,
-                        c.credit,
-                        cs.start_time,
-                        cs.end_time,
-                        c.instructor,
-                        cs.remarks
-                    FROM courses c
-                    LEFT JOIN course_sessions cs ON c.course_code = cs.course_code
-                    ORDER BY c.course_code, cs.day, cs.start_time
-                ''')
+                cursor.execute(self.ALL_COURSES_SQL)
 
                 columns = ["course_code", "name", "type", "day", "venue", "credit", "start_time", "end_time", "instructor", "remarks"]
                 results = []
@@ -381,28 +686,32 @@ class DatabaseManager:
             logging.error(f"Error fetching all courses: {str(e)}")
             return []  # 返回空列表
 
+    @cached_query
+    def iter_courses(self, after_code: str = None, limit: int = COURSE_PAGE_SIZE) -> List[Dict]:
+        """One page of the catalog: sessions of the first ``limit`` courses after ``after_code``.
+
+        Pass the last course code of the previous page to get the next one;
+        an empty or short page means the catalog is exhausted.
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(self.COURSE_PAGE_SQL, (after_code or '', limit))
+
+                columns = ["course_code", "name", "type", "day", "venue", "credit", "start_time", "end_time", "instructor", "remarks"]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        except sqlite3.Error as e:
+            logging.error(f"Error fetching course page: {str(e)}")
+            return []
+
+    @cached_query
     def get_cart_courses(self) -> List[Dict]:
         """Get courses in cart with their sessions"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT 
-                        c.course_code,
-                        c.name,
-                        cs.type,
-                        cs.day,
-                        cs.venue,
-                        c.credit,
-                        cs.start_time,
-                        cs.end_time,
-                        c.instructor,
-                        cs.remarks
-                    FROM courses c
-                    JOIN cart ct ON c.course_code = ct.course_code
-                    JOIN course_sessions cs ON c.course_code = cs.course_code
-                    ORDER BY c.course_code, cs.day, cs.start_time
-                ''')
+                cursor.execute(self.CART_COURSES_SQL)
 
                 columns = ["course_code", "name", "type", "day", "venue", "credit", "start_time", "end_time", "instructor", "remarks"]
                 results = []
@@ -430,12 +739,8 @@ class DatabaseManager:
                 cursor = conn.cursor()
 
                 # Check if course exists and get its details
-                cursor.execute('''
-                    SELECT cs.course_code, cs.name, cs.day, cs.start_time, cs.end_time, cs.type 
-                    FROM course_sessions cs 
-                    WHERE cs.course_code = ?
-                ''', (course_code,))
-                course_details = cursor.fetchone()
+                with self.read_connection() as catalog:
+                    course_details = catalog.execute(self.COURSE_SESSIONS_SQL, (course_code,)).fetchone()
 
                 if not course_details:
                     error_msg = f"Course {course_code} not found in database"
@@ -443,18 +748,14 @@ class DatabaseManager:
                     return False, error_msg
 
                 # Check if course is already in cart
-                cursor.execute('SELECT 1 FROM cart WHERE course_code = ?', (course_code,))
+                cursor.execute(self.IN_CART_SQL, (course_code,))
                 if cursor.fetchone():
                     msg = f"Course {course_code} is already in cart"
                     logging.info(msg)
                     return False, msg
 
                 # Get all courses in cart with their schedules
-                cursor.execute('''
-                    SELECT cs.course_code, cs.name, cs.day, cs.start_time, cs.end_time, cs.type
-                    FROM course_sessions cs
-                    JOIN cart ct ON cs.course_code = ct.course_code
-                ''')
+                cursor.execute(self.CART_SESSIONS_SQL)
                 cart_courses = cursor.fetchall()
 
                 # Check for time conflicts if not force adding
@@ -503,6 +804,7 @@ class DatabaseManager:
                 # If all checks pass or force is True, add to cart
                 cursor.execute('INSERT INTO cart (course_code) VALUES (?)', (course_code,))
                 conn.commit()
+                self.bump_data_version()
 
                 success_msg = f"Successfully added {course_code} to cart"
                 if force:
@@ -526,6 +828,7 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM cart WHERE course_code = ?', (course_code,))
                 conn.commit()
+                self.bump_data_version()
                 return True
         except sqlite3.Error as e:
             logging.error(f"Error removing course from cart: {str(e)}")
@@ -538,6 +841,7 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM cart')
                 conn.commit()
+                self.bump_data_version()
                 return True
         except sqlite3.Error as e:
             logging.error(f"Error clearing cart: {str(e)}")
@@ -548,7 +852,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT 1 FROM cart WHERE course_code = ?', (course_code,))
+                cursor.execute(self.IN_CART_SQL, (course_code,))
                 return cursor.fetchone() is not None
         except sqlite3.Error as e:
             logging.error(f"Error checking cart status: {str(e)}")
@@ -556,11 +860,12 @@ class DatabaseManager:
 
 #___________________Course Translation_______________________
 
+    @cached_query
     def get_available_programs(self):
         """Get list of available programs"""
         try:
             query = "SELECT program_code, program_name FROM programs"
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query)
                 programs = cursor.fetchall()
@@ -574,63 +879,49 @@ class DatabaseManager:
             logging.error(f"Error getting programs: {str(e)}")
             return {'success': False, 'message': str(e)}
 
+    @cached_query
     def get_majors_for_program(self, program_code: str) -> dict:
         """Get available majors for a specific program"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT major_code, major_name 
-                    FROM program_majors 
-                    WHERE program_code = ?
-                """, (program_code,))
+                cursor.execute(self.MAJORS_SQL, (program_code,))
                 majors = {row[0]: row[1] for row in cursor.fetchall()}
                 return {"success": True, "majors": majors}
         except sqlite3.Error as e:
             return {"success": False, "message": str(e)}
 
+    @cached_query
     def get_groups_for_major(self, program_code: str, major_code: str) -> dict:
         """Get available course groups for a specific major in a program"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT g.group_id, g.group_name
-                    FROM course_groups g
-                    JOIN major_requirements mr ON g.group_id = mr.group_id
-                    WHERE mr.program_code = ? AND mr.major_code = ?
-                """, (program_code, major_code))
+                cursor.execute(self.GROUPS_SQL, (program_code, major_code))
                 groups = {row[0]: row[1] for row in cursor.fetchall()}
                 return {"success": True, "groups": groups}
         except sqlite3.Error as e:
             return {"success": False, "message": str(e)}
 
+    @cached_query
     def get_courses_for_group(self, program_code: str, major_code: str, group_id: int) -> dict:
         """Get available courses for a specific group in a major"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT mr.course_code, ce.course_name
-                    FROM major_requirements mr
-                    JOIN course_equivalences ce ON mr.course_code = ce.sz_code
-                    WHERE mr.program_code = ? AND mr.major_code = ? AND mr.group_id = ?
-                """, (program_code, major_code, group_id))
+                cursor.execute(self.GROUP_COURSES_SQL, (program_code, major_code, group_id))
                 courses = {row[0]: row[1] for row in cursor.fetchall()}
                 return {"success": True, "courses": courses}
         except sqlite3.Error as e:
             return {"success": False, "message": str(e)}
 
+    @cached_query
     def get_course_equivalence(self, course_code: str) -> dict:
         """Get course equivalence information"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT sz_code, hk_code, course_name, credits, description
-                    FROM course_equivalences
-                    WHERE sz_code = ? OR hk_code = ?
-                """, (course_code, course_code))
+                cursor.execute(self.EQUIVALENCE_SQL, (course_code, course_code))
                 result = cursor.fetchone()
 
                 if result:
@@ -648,6 +939,7 @@ class DatabaseManager:
         except sqlite3.Error as e:
             return {"success": False, "message": str(e)}
 
+    @cached_query
     def get_filtered_courses(self, program_code: str, major_code: str, group_name: str, campus: str = None) -> dict:
         """Get courses based on selected filters with debug logging"""
         try:
@@ -657,17 +949,10 @@ class DatabaseManager:
             logging.info(f"Group: {group_name}")
             logging.info(f"Campus: {campus}")
 
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
 
-                query = """
-                    SELECT DISTINCT mr.course_code, mr.campus
-                    FROM major_requirements mr
-                    JOIN course_groups cg ON mr.group_id = 
-                        (SELECT group_id FROM course_groups WHERE group_name = ?)
-                    WHERE mr.program_code = ? 
-                    AND mr.major_code = ?
-                """
+                query = self.FILTERED_COURSES_SQL
                 params = [group_name, program_code, major_code]
 
                 if campus:
@@ -0,0 +1,286 @@
+# database/import_session.py
+import logging
+import itertools
+from contextlib import contextmanager
+from typing import Dict, Optional
+import openpyxl
+import pandas as pd
+from config import IMPORT_CHUNK_SIZE, IMPORT_ERROR_LIMIT
+
+COURSE_COLUMNS = ['course_code', 'name', 'type', 'day', 'venue', 'credit',
+                  'start_time', 'end_time', 'instructor', 'remarks']
+TRANSLATION_SHEET_NAMES = ['Programs', 'Program_Majors', 'Course_Groups',
+                           'Major_Requirements', 'Course_Equivalences']
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import when its caller asked it to stop"""
+
+
+class ImportSession:
+    """A course or translation file, parsed once.
+
+    Validation, the preview and the import all read the frames parsed here,
+    so the file is opened and decoded a single time however many of those
+    steps run. ``kind`` is 'courses' or 'translation'; a file that could not
+    be read keeps ``error`` set instead.
+
+    A course CSV is only read up to its first ``chunk_size`` rows here, which
+    is enough to validate and preview; iter_course_chunks streams the rest at
+    import time, so memory stays flat however large the file is. Likewise
+    only the header row of each translation sheet is read up front, and
+    translation_rows streams the rest from a read-only workbook.
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.extension = file_path.lower().split('.')[-1]
+        self.chunk_size = chunk_size
+        self.kind: Optional[str] = None
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.sheets: Dict[str, tuple] = {}  # translation sheet -> (headers, row count)
+        self.complete = True  # False while part of a CSV is still unread
+        self.error: Optional[str] = None
+        self.rows_read = 0  # course rows streamed so far by iter_course_chunks
+        self.rejected_count = 0
+        self.errors = []  # (line, course_code, reason) for the first IMPORT_ERROR_LIMIT rejects
+        self._prepared = None
+        self._workbook = None
+        self._total_rows = None
+        self._parse()
+
+    def _parse(self):
+        if self.extension not in ['csv', 'xlsx', 'xls']:
+            self.error = "Unsupported file format"
+            return
+
+        try:
+            if self.extension == 'csv':
+                self.kind = 'courses'
+                self.frames['courses'] = pd.read_csv(self.file_path, nrows=self.chunk_size)
+                self.complete = len(self.frames['courses']) < self.chunk_size
+                return
+
+            with self.workbook() as workbook:
+                if workbook is None:
+                    # openpyxl cannot read the legacy .xls format; those are loaded whole
+                    self.frames = pd.read_excel(self.file_path, sheet_name=None, header=None)
+                sheet_names = list(self.frames) if workbook is None else workbook.sheetnames
+
+                if not all(sheet in sheet_names for sheet in TRANSLATION_SHEET_NAMES):
+                    self.kind = 'courses'
+                    self.frames = {'courses': pd.read_excel(self.file_path)}
+                    return
+
+                self.kind = 'translation'
+                self._scan_sheets(sheet_names)
+        except Exception as e:
+            logging.error(f"Error reading {self.file_path}: {str(e)}")
+            self.kind = None
+            self.frames = {}
+            self.sheets = {}
+            self.error = f"Error reading file: {str(e)}"
+
+    def _scan_sheets(self, sheet_names):
+        """Headers and row counts for the preview, without reading past the header row"""
+        for sheet in sheet_names:
+            headers, _ = self._sheet_headers(next(self._sheet_rows(sheet), ()))
+            self.sheets[sheet] = (headers, self._sheet_size(sheet))
+
+    def _sheet_size(self, sheet: str) -> Optional[int]:
+        """Data rows in a sheet, from its dimension record; None if the writer left it out"""
+        if self.extension == 'xls':
+            return max(len(self.frames[sheet]) - 1, 0)
+        max_row = self._workbook[sheet].max_row
+        return max_row - 1 if max_row else None
+
+    @contextmanager
+    def workbook(self):
+        """Keep one read-only openpyxl workbook open for the sheets read inside the block"""
+        if self._workbook is not None or self.extension == 'xls':
+            yield self._workbook
+            return
+        self._workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            yield self._workbook
+        finally:
+            self._workbook.close()
+            self._workbook = None
+
+    def _sheet_rows(self, sheet: str):
+        """Raw value tuples of a workbook sheet, header row first, blanks as None"""
+        if self.extension == 'xls':
+            df = self.frames[sheet].astype(object)
+            yield from df.where(df.notna(), None).itertuples(index=False, name=None)
+            return
+
+        with self.workbook() as workbook:
+            yield from workbook[sheet].iter_rows(values_only=True)
+
+    @staticmethod
+    def _sheet_headers(header_row):
+        """(headers, packed) for a header row.
+
+        Some workbooks were saved with each row as one comma-packed cell;
+        that shows in the header, so rows can be split as they stream by.
+        """
+        first = header_row[0] if header_row else None
+        if isinstance(first, str) and ',' in first:
+            return first.split(','), True
+        return list(header_row), False
+
+    @property
+    def courses(self):
+        return self.frames['courses']
+
+    @property
+    def total_rows(self) -> Optional[int]:
+        """Data rows in the file for progress reporting, or None if unknown.
+
+        A partly read CSV is sized by counting its line breaks, which is
+        cheap next to parsing; quoted multi-line cells make it an estimate.
+        """
+        if self._total_rows is None:
+            if self.kind == 'translation':
+                sizes = [self.sheets[sheet][1] for sheet in TRANSLATION_SHEET_NAMES]
+                self._total_rows = None if None in sizes else sum(sizes)
+            elif self.kind == 'courses' and self.complete:
+                self._total_rows = len(self.courses)
+            elif self.kind == 'courses':
+                lines, last = 0, b'\n'
+                with open(self.file_path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        lines += block.count(b'\n')
+                        last = block[-1:]
+                self._total_rows = lines - (last == b'\n')  # minus the header line
+        return self._total_rows
+
+    def validate(self) -> tuple:
+        """(is_valid, message) for the parsed file"""
+        if self.error:
+            return False, self.error
+        if self.kind == 'translation':
+            return True, "Valid translation file"
+
+        missing_columns = [col for col in COURSE_COLUMNS if col not in self.courses.columns]
+        if missing_columns:
+            return False, f"Missing required columns: {', '.join(missing_columns)}"
+
+        rejected = self.prepare_courses()[2]
+        if len(rejected):
+            checked = f"{len(self.courses)}" if self.complete else f"the first {len(self.courses)}"
+            return True, f"Valid course file ({len(rejected)} of {checked} rows will be skipped)"
+        return True, "Valid course file"
+
+    def prepare_courses(self):
+        """The prepared form of the parsed course frame, computed once"""
+        if self._prepared is None:
+            self._prepared = self._prepare_course_frame(self.courses)
+        return self._prepared
+
+    def iter_course_chunks(self):
+        """Yield (courses, sessions) frames for the whole file, one chunk at a time.
+
+        The already parsed head is reused; the rest of a CSV is streamed in
+        ``chunk_size`` rows. Rejected rows are counted in ``rejected_count``
+        and the first IMPORT_ERROR_LIMIT of them kept in ``errors``, with
+        their line number in the file.
+        """
+        self.rows_read = 0
+        self.rejected_count = 0
+        self.errors = []
+        chunks = [self.courses]
+        if not self.complete:
+            # Skip the data lines already parsed; line 0 is the header
+            rest = pd.read_csv(self.file_path, chunksize=self.chunk_size,
+                               skiprows=range(1, len(self.courses) + 1))
+            chunks = itertools.chain(chunks, rest)
+
+        offset = 0
+        for i, chunk in enumerate(chunks):
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            courses, sessions, rejected = self.prepare_courses() if i == 0 else self._prepare_course_frame(chunk)
+            for index, reason in rejected.head(IMPORT_ERROR_LIMIT - len(self.errors)).items():
+                self.errors.append((index + 2, chunk.at[index, 'course_code'], reason.rstrip('; ')))
+            self.rejected_count += len(rejected)
+            self.rows_read = offset
+            yield courses, sessions
+
+    @staticmethod
+    def _prepare_course_frame(df):
+        """Coerce and validate a course frame column-wise.
+
+        Returns (courses, sessions, rejected): the frames for the two inserts
+        and a Series of reasons for the rows that were dropped. The checks
+        mirror the course_sessions constraints, so a batch never fails
+        halfway on a bad row. Blank optional cells take the column's
+        database default; blank required ones reject the row.
+        """
+        reasons = pd.Series('', index=df.index)
+
+        def text(column, default=None):
+            if column not in df.columns:
+                return pd.Series(default, index=df.index, dtype=object)
+            missing = df[column].isna()
+            if default is None:
+                reasons.loc[missing] += f'missing {column}; '
+            return df[column].astype(str).where(~missing, default).astype(object)
+
+        def number(column):
+            values = pd.to_numeric(df[column], errors='coerce')
+            reasons.loc[values.isna()] += f'invalid {column}; '
+            return values
+
+        sessions = pd.DataFrame({
+            'course_code': text('course_code'),  # e.g., "CS101 A LEC" or "CS101 A TUT"
+            'name': text('name'),
+            'type': text('type'),
+            'day': number('day'),
+            'venue': text('venue', 'TBA'),
+            'credit': number('credit'),
+            'start_time': text('start_time'),
+            'end_time': text('end_time'),
+            'instructor': text('instructor', 'STAFF'),
+            'remarks': text('remarks', 'None'),
+        })
+        reasons.loc[(sessions['day'] < 0) | (sessions['day'] > 4)] += 'day out of range; '
+        for column in ('start_time', 'end_time'):
+            reasons.loc[~sessions[column].astype(str).str.fullmatch(r'..:..')] += f'invalid {column}; '
+
+        valid = reasons == ''
+        sessions = sessions[valid]
+        sessions['day'] = sessions['day'].astype(int)
+        sessions['credit'] = sessions['credit'].astype(int)
+
+        # Base course row from the first session of each course code
+        courses = sessions.drop_duplicates('course_code')[['course_code', 'name', 'credit', 'instructor']]
+        return courses, sessions, reasons[~valid]
+
+    def translation_rows(self, sheet: str, columns):
+        """Stream the given columns of a translation sheet as insert parameter tuples.
+
+        Cells are stripped text and blank cells become None, so NOT NULL
+        columns still reject them; 'credits' is read as a number. Fully blank
+        rows are skipped.
+        """
+        rows = self._sheet_rows(sheet)
+        headers, packed = self._sheet_headers(next(rows, ()))
+        missing_columns = [col for col in columns if col not in headers]
+        if missing_columns:
+            raise ValueError(f"{sheet} is missing columns: {', '.join(missing_columns)}")
+        positions = [headers.index(col) for col in columns]
+
+        def clean(column, value):
+            if value is None:
+                return None
+            value = str(value).strip()
+            return float(value) if column == 'credits' else value
+
+        for row in rows:
+            if packed:
+                row = () if row[0] is None else str(row[0]).split(',')
+            if all(value is None for value in row):
+                continue
+            yield tuple(clean(column, row[i] if i < len(row) else None)
+                        for column, i in zip(columns, positions))
@@ -30,7 +30,9 @@ def main():
         context = AppContext()
         controller = MainController(context)
         controller.show()
-        sys.exit(app.exec())
+        exit_code = app.exec()
+        context.close()
+        sys.exit(exit_code)
     except Exception as e:
         logging.error(f"Application error: {str(e)}")
         sys.exit(1)
@@ -96,6 +96,7 @@ class MainWindow(QMainWindow):
         self.timetable_controller = None
         self.cart_controller = None
         self.search_controller = None
+        self.db_manager = None
 
         self.setup_ui()
 
@@ -159,6 +160,14 @@ class MainWindow(QMainWindow):
             self.sub_nav.setGeometry(0, self.menubar.height(), self.width(), 30)
 
 
+    def closeEvent(self, event):
+        # Stop any timetable search before its thread is torn down
+        if self.timetable_controller:
+            self.timetable_controller.cancel_generation(wait=True)
+        if self.search_controller:
+            self.search_controller.shutdown()
+        super().closeEvent(event)
+
     def setup_status_bar(self):
         self.statusbar = QStatusBar()
         self.setStatusBar(self.statusbar)
@@ -198,7 +207,7 @@ class MainWindow(QMainWindow):
 
     def show_import_dialog(self):
         """Show the import dialog"""
-        dialog = ImportDialog(self)
+        dialog = ImportDialog(self, self.db_manager)
         dialog.import_completed.connect(self.on_import_completed)
         dialog.exec()
 
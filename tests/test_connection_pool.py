@@ -0,0 +1,54 @@
+# tests/test_connection_pool.py
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from database.connection_pool import ConnectionPool, SnapshotPool
+
+
+class SnapshotPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = ConnectionPool(os.path.join(self.root, 'courses.db'))
+        with self.source.session() as conn:
+            conn.execute('CREATE TABLE courses (course_code TEXT PRIMARY KEY)')
+            conn.execute("INSERT INTO courses VALUES ('CS101')")
+            conn.commit()
+        self.snapshot = SnapshotPool(self.source)
+
+    def tearDown(self):
+        self.snapshot.close_all()
+        self.source.close_all()
+        shutil.rmtree(self.root)
+
+    def read(self):
+        with self.snapshot.session() as conn:
+            return conn, [row[0] for row in conn.execute('SELECT course_code FROM courses ORDER BY 1')]
+
+    def test_threads_share_one_copy(self):
+        conn, codes = self.read()
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(self.read()))
+        thread.start()
+        thread.join()
+        self.assertIs(seen[0][0], conn)
+        self.assertEqual(seen[0][1], codes)
+
+        # A worker thread exiting keeps the copy loaded
+        self.snapshot.release()
+        self.assertIs(self.read()[0], conn)
+
+    def test_refresh_loads_a_new_copy(self):
+        self.read()
+        with self.source.session() as conn:
+            conn.execute("INSERT INTO courses VALUES ('MATH200')")
+            conn.commit()
+        self.assertEqual(self.read()[1], ['CS101'])
+        self.snapshot.refresh()
+        self.assertEqual(self.read()[1], ['CS101', 'MATH200'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_query_plans.py
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from database.db_init import migrate
+from database.db_manager import DatabaseManager
+
+
+class QueryPlanTest(unittest.TestCase):
+    """The hot queries stay index-backed on a freshly migrated database"""
+
+    def setUp(self):
+        # resource_path resolves data/courses.db against the working directory
+        self.cwd = os.getcwd()
+        self.root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.root, 'data'))
+        conn = sqlite3.connect(os.path.join(self.root, 'data', 'courses.db'))
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        os.chdir(self.root)
+        self.db = DatabaseManager(snapshot=False)
+
+    def tearDown(self):
+        self.db.pool.close_all()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root)
+
+    def test_hot_queries_use_indexes(self):
+        report = self.db.check_query_plans()
+        self.assertIn('search_courses_fts', report)
+        for name, result in report.items():
+            with self.subTest(query=name):
+                self.assertTrue(result['uses_index'], result['plan'])
+
+    def test_scan_using_index_is_a_full_scan(self):
+        plan = ['SCAN c USING INDEX sqlite_autoindex_courses_1',
+                'SEARCH cs USING INDEX idx_course_sessions_course (course_code=?) LEFT-JOIN']
+        self.assertEqual(DatabaseManager._full_scans(plan, ()), [plan[0]])
+        self.assertEqual(DatabaseManager._full_scans(plan, ('c',)), [])
+
+    def test_automatic_index_is_not_index_backed(self):
+        plan = ['SEARCH g USING AUTOMATIC COVERING INDEX (group_id=?)',
+                'SEARCH g USING INTEGER PRIMARY KEY (rowid=?)',
+                'SCAN CONSTANT ROW']
+        self.assertEqual(DatabaseManager._full_scans(plan, ()), [plan[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# tests/test_timetable_service.py
+import os
+import shutil
+import tempfile
+import unittest
+from utils.schedule_cache import ScheduleCache
+from utils.timetable_service import ScheduleCursor, TimetableService
+
+
+def overlapping_pairs(count):
+    """A cart of ``count`` clashing section pairs, 2 ** count maximum schedules"""
+    cart = []
+    for k in range(count):
+        for section, end_time in (('A', '10:00'), ('B', '11:00')):
+            start = f"{9 + 2 * (k // 5):02d}:00"
+            end = f"{int(end_time[:2]) + 2 * (k // 5):02d}:00"
+            cart.append({'course_code': f'C{k} {section} LEC', 'name': f'Course {k}', 'type': 'LEC',
+                         'day': k % 5, 'venue': 'TBA', 'credit': 3, 'start_time': start,
+                         'end_time': end, 'instructor': 'STAFF', 'remarks': 'None'})
+    return cart
+
+
+class ScheduleCursorTest(unittest.TestCase):
+
+    def test_known_schedules_from_another_page_size(self):
+        # Ten schedules cached four at a time, browsed three per page
+        schedules = [{'selected': [f'C{i}']} for i in range(10)]
+        cursor = ScheduleCursor(iter(schedules[4:]), {}, page_size=3, known=schedules[:4])
+        self.assertEqual([cursor.get(i) for i in range(10)], schedules)
+        self.assertIsNone(cursor.get(10))
+        self.assertTrue(all(len(page) == 3 for page in cursor.pages[:-1]))
+
+
+
+class ScheduleRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ScheduleCache(os.path.join(self.root, 'schedule_cache.db'))
+        self.cart = overlapping_pairs(6)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.root)
+
+    def test_solve_anytime_memoizes_a_restored_cursor(self):
+        first = TimetableService(schedule_cache=self.cache, ranking_weights={}).get_schedule_cursor(self.cart)
+        page_size = first.page_size
+        self.assertFalse(first.exhausted)
+
+        # A fresh service, as after a restart, only has the disk cache
+        service = TimetableService(schedule_cache=self.cache, ranking_weights={})
+        key = service.cache_key(self.cart)
+        cursor = service.solve_anytime(self.cart, time_budget=5, refine_in_background=False)
+        self.assertEqual(cursor.known_count, page_size)
+        self.assertIs(service.lookup(key), cursor)
+        self.assertIs(service.solve_anytime(self.cart, time_budget=5, refine_in_background=False), cursor)
+
+        # Pages loaded later are written through to disk
+        self.assertTrue(cursor.has(page_size))
+        self.assertEqual(len(self.cache.load(key)['schedules']), 2 * page_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
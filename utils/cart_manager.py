@@ -7,8 +7,8 @@ from datetime import datetime
 
 class CartManager:
 
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db_manager=None):
+        self.db = db_manager or DatabaseManager()
 
     def get_cart_courses(self):
         courses = self.db.get_cart_courses()
@@ -20,3 +20,6 @@ class CartManager:
 
     def remove_from_cart(self, course_code: str) -> bool:
         return self.db.remove_from_cart(course_code)
+
+    def clear_cart(self) -> bool:
+        return self.db.clear_cart()
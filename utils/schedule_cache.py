@@ -0,0 +1,149 @@
+# utils/schedule_cache.py
+import sqlite3
+import os
+import json
+import struct
+import time
+import zlib
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+from config import SCHEDULE_CACHE_FILE, SCHEDULE_CACHE_MAX_ENTRIES, SCHEDULE_CACHE_MAX_BYTES
+from utils.helper import resource_path
+from database.connection_pool import ConnectionPool
+
+
+class ScheduleCache:
+    """Solved schedule sets persisted in a sidecar SQLite file.
+
+    Entries are keyed by the cart fingerprint plus catalog version, stored as
+    zlib-compressed bitmasks over the cart's course list and evicted least
+    recently used first once the entry count or total size exceeds its cap.
+    """
+
+    def __init__(self, db_path: str = None, max_entries: int = SCHEDULE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = SCHEDULE_CACHE_MAX_BYTES):
+        self.db_path = db_path or resource_path(os.path.join('data', SCHEDULE_CACHE_FILE))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.pool = ConnectionPool(self.db_path)
+
+        try:
+            with self.get_connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS schedule_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        payload BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_used REAL NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_schedule_cache_last_used ON schedule_cache (last_used)')
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error initializing schedule cache: {str(e)}")
+
+    @contextmanager
+    def get_connection(self):
+        """Context manager for the calling thread's pooled cache connection"""
+        with self.pool.session() as conn:
+            yield conn
+
+    def release(self):
+        """Close the calling thread's connection, e.g. before a worker thread exits"""
+        self.pool.release()
+
+    def close(self):
+        self.pool.close_all()
+
+    @staticmethod
+    def make_key(key: Tuple[str, int]) -> str:
+        fingerprint, catalog_version = key
+        return hashlib.sha1(f"{fingerprint}:{catalog_version}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def encode(course_codes: List[str], schedules: List[List[str]], exhausted: bool) -> bytes:
+        """Pack schedules as fixed-width bitmasks over ``course_codes``"""
+        position = {code: i for i, code in enumerate(course_codes)}
+        width = (len(course_codes) + 7) // 8
+        header = json.dumps({'course_codes': course_codes, 'exhausted': exhausted}).encode('utf-8')
+
+        body = bytearray()
+        for selected in schedules:
+            mask = 0
+            for code in selected:
+                mask |= 1 << position[code]
+            body += mask.to_bytes(width, 'little')
+        return zlib.compress(struct.pack('>I', len(header)) + header + bytes(body))
+
+    @staticmethod
+    def decode(payload: bytes) -> Dict:
+        raw = zlib.decompress(payload)
+        header_len = struct.unpack('>I', raw[:4])[0]
+        header = json.loads(raw[4:4 + header_len].decode('utf-8'))
+        course_codes = header['course_codes']
+        width = (len(course_codes) + 7) // 8
+
+        schedules = []
+        body = raw[4 + header_len:]
+        for start in range(0, len(body), width):
+            mask = int.from_bytes(body[start:start + width], 'little')
+            schedules.append([code for i, code in enumerate(course_codes) if mask >> i & 1])
+        return {'course_codes': course_codes, 'schedules': schedules, 'exhausted': header['exhausted']}
+
+    def load(self, key: Tuple[str, int]) -> Optional[Dict]:
+        """Return the cached schedule set for ``key`` or None"""
+        cache_key = self.make_key(key)
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute('SELECT payload FROM schedule_cache WHERE cache_key = ?', (cache_key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute('UPDATE schedule_cache SET last_used = ? WHERE cache_key = ?', (time.time(), cache_key))
+                conn.commit()
+            return self.decode(row[0])
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logging.error(f"Error reading schedule cache: {str(e)}")
+            return None
+
+    def store(self, key: Tuple[str, int], course_codes: List[str], schedules: List[List[str]], exhausted: bool):
+        """Save a schedule set and evict the least recently used entries over the caps"""
+        payload = self.encode(course_codes, schedules, exhausted)
+        if len(payload) > self.max_bytes:
+            logging.info(f"Schedule set of {len(payload)} bytes exceeds the cache cap, not stored")
+            return
+
+        try:
+            with self.get_connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO schedule_cache (cache_key, payload, size, last_used)
+                    VALUES (?, ?, ?, ?)
+                ''', (self.make_key(key), payload, len(payload), time.time()))
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error writing schedule cache: {str(e)}")
+
+    def _evict(self, conn):
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM schedule_cache').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        doomed = []
+        for cache_key, size in conn.execute('SELECT cache_key, size FROM schedule_cache ORDER BY last_used'):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((cache_key,))
+            count -= 1
+            total -= size
+        conn.executemany('DELETE FROM schedule_cache WHERE cache_key = ?', doomed)
+        logging.info(f"Evicted {len(doomed)} cached schedule sets")
+
+    def clear(self):
+        try:
+            with self.get_connection() as conn:
+                conn.execute('DELETE FROM schedule_cache')
+                conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error clearing schedule cache: {str(e)}")
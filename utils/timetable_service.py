@@ -1,15 +1,306 @@
 # utils/timetable_service.py
-from datetime import datetime
-from models.course import Course
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Tuple, Iterator, Optional, Callable
 import logging
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from itertools import islice
+import hashlib
+import json
+import re
+import heapq
+import threading
+import time
+from config import (SCHEDULE_PAGE_SIZE, SCHEDULE_MEMO_SIZE, SECTION_AWARE_SCHEDULING,
+                    SCHEDULE_RANKING_WEIGHTS, RANKING_TOP_K, LUNCH_START, LUNCH_END, MIN_HOUR)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(time_str: str) -> int:
+    """Convert an HH:MM string to minutes since midnight"""
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class SearchCancelled(Exception):
+    """Raised inside the solver when its caller asked it to stop"""
+
+
+class SearchTimeout(Exception):
+    """Raised inside the solver when its wall-clock deadline has passed"""
+
+
+COURSE_CODE_PATTERN = re.compile(r'^\s*([A-Za-z]+)\s*(\d+[A-Za-z]?)\s+(\S+)(?:\s+([A-Za-z]+))?\s*$')
+
+
+def parse_course_code(course_code: str) -> Optional[Dict]:
+    """Split a section code such as "CS101 A LEC" into its parts.
+
+    The type is None when the code stops after the section ("TEST404 A").
+    Returns None when the code does not follow the subject/number/section layout.
+    """
+    match = COURSE_CODE_PATTERN.match(course_code or '')
+    if not match:
+        return None
+    subject, number, section, component = match.groups()
+    return {
+        'subject': subject.upper(),
+        'number': number.upper(),
+        'section': section.upper(),
+        'type': component.upper() if component else None
+    }
+
+
+def popcount(value: int) -> int:
+    """Number of set bits in a non-negative integer"""
+    return bin(value).count('1')
+
+
+class ScheduleSolver:
+    """Branch-and-bound search for the largest conflict-free course sets.
+
+    The conflict matrix is one adjacency bitset per course. Courses are
+    relabelled by ascending conflict degree so that the include-first branch
+    finds a good schedule early, and every node is bounded by a greedy clique
+    cover of the remaining candidates: courses in one clique pairwise clash,
+    so at most one per clique can still be added.
+
+    ``progress`` is called as ``progress(nodes, best_size, best_schedule)``
+    every ``PROGRESS_INTERVAL`` nodes and whenever a larger schedule is found.
+    ``should_stop`` is polled at the same points; returning True aborts the
+    search with SearchCancelled. ``deadline`` is a ``time.monotonic()`` value
+    checked every ``DEADLINE_INTERVAL`` nodes; passing it raises SearchTimeout
+    with the best schedule so far left in ``best_schedule``.
+    """
+
+    PROGRESS_INTERVAL = 2048
+    DEADLINE_INTERVAL = 64
+
+    def __init__(self, conflict_matrix: List[int],
+                 progress: Optional[Callable[[int, int, List[int]], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 deadline: Optional[float] = None):
+        n = len(conflict_matrix)
+        self.conflict_matrix = conflict_matrix
+        self.order = sorted(range(n), key=lambda i: (popcount(conflict_matrix[i]), i))
+        position = {course: pos for pos, course in enumerate(self.order)}
+
+        self.adjacency = []
+        for course in self.order:
+            row = 0
+            neighbours = conflict_matrix[course]
+            while neighbours:
+                low = neighbours & -neighbours
+                row |= 1 << position[low.bit_length() - 1]
+                neighbours ^= low
+            self.adjacency.append(row)
+
+        self.all_candidates = (1 << n) - 1
+        self.nodes = 0
+        self.best_size = 0
+        self.best_schedule = []
+        self.progress = progress
+        self.should_stop = should_stop
+        self.deadline = deadline
+
+    def _visit(self):
+        """Count a search node and service the progress/cancel/deadline hooks"""
+        self.nodes += 1
+        if self.nodes % self.PROGRESS_INTERVAL == 0:
+            self._report()
+        if (self.deadline is not None and self.nodes % self.DEADLINE_INTERVAL == 0
+                and time.monotonic() > self.deadline):
+            raise SearchTimeout()
+
+    def _report(self):
+        if self.should_stop and self.should_stop():
+            raise SearchCancelled()
+        if self.progress:
+            self.progress(self.nodes, self.best_size, self.best_schedule)
+
+    def upper_bound(self, candidates: int) -> int:
+        """Greedy clique cover size of the candidate set"""
+        adjacency = self.adjacency
+        cliques = 0
+        while candidates:
+            cliques += 1
+            low = candidates & -candidates
+            candidates ^= low
+            clique_candidates = candidates & adjacency[low.bit_length() - 1]
+            while clique_candidates:
+                member = clique_candidates & -clique_candidates
+                candidates ^= member
+                clique_candidates &= adjacency[member.bit_length() - 1]
+        return cliques
+
+    def find_max_size(self) -> int:
+        """Size of the largest conflict-free schedule"""
+
+        def search(chosen: List[int], candidates: int):
+            self._visit()
+
+            if not candidates:
+                if len(chosen) > self.best_size:
+                    self.best_size = len(chosen)
+                    self.best_schedule = sorted(self.order[pos] for pos in chosen)
+                    self._report()
+                return
+            if len(chosen) + popcount(candidates) <= self.best_size:
+                return
+            if len(chosen) + self.upper_bound(candidates) <= self.best_size:
+                return
+
+            low = candidates & -candidates
+            course = low.bit_length() - 1
+            chosen.append(course)
+            search(chosen, candidates & ~self.adjacency[course] & ~low)
+            chosen.pop()
+            if candidates & self.adjacency[course]:
+                search(chosen, candidates ^ low)
+
+        search([], self.all_candidates)
+        return self.best_size
+
+    def iter_schedules(self, target: int):
+        """Yield every conflict-free schedule of exactly ``target`` courses.
+
+        Schedules are lists of indices into the original conflict matrix.
+        """
+
+        def search(chosen: List[int], candidates: int):
+            self._visit()
+
+            if not candidates:
+                if len(chosen) == target:
+                    yield sorted(self.order[pos] for pos in chosen)
+                return
+            if len(chosen) + popcount(candidates) < target:
+                return
+            if len(chosen) + self.upper_bound(candidates) < target:
+                return
+
+            low = candidates & -candidates
+            course = low.bit_length() - 1
+            chosen.append(course)
+            yield from search(chosen, candidates & ~self.adjacency[course] & ~low)
+            chosen.pop()
+            # A course with no remaining rivals belongs to every maximum schedule
+            if candidates & self.adjacency[course]:
+                yield from search(chosen, candidates ^ low)
+
+        yield from search([], self.all_candidates)
+
 
 class TimetableAlgorithm:
     @staticmethod
-    def generate_combinations(courses_input: List[Dict]) -> Tuple[List[Dict], Dict]:
-        logging.info(f"Received courses for timetable generation: {courses_input}")
+    def build_slot_mask(sessions: List[Dict]) -> int:
+        """Turn a course's sessions into a minute-of-week bitmask.
+
+        Bit ``day * 1440 + minute`` is set for every minute the course occupies.
+        Sessions are half-open intervals, so a class ending at 10:30 does not
+        clash with one starting at 10:30.
+        """
+        mask = 0
+        for session in sessions:
+            start = time_to_minutes(session['start_time'])
+            end = time_to_minutes(session['end_time'])
+            if end <= start:
+                continue
+            offset = session['day'] * MINUTES_PER_DAY + start
+            mask |= ((1 << (end - start)) - 1) << offset
+        return mask
+
+    @staticmethod
+    def build_conflict_matrix(slot_masks: List[int]) -> List[int]:
+        """Build a conflict matrix as one adjacency bitset per course.
+
+        Bit ``j`` of ``matrix[i]`` is set when courses ``i`` and ``j`` overlap.
+        """
+        n = len(slot_masks)
+        matrix = [0] * n
+        for i in range(n):
+            mask_i = slot_masks[i]
+            for j in range(i + 1, n):
+                if mask_i & slot_masks[j]:
+                    matrix[i] |= 1 << j
+                    matrix[j] |= 1 << i
+        return matrix
+
+    @staticmethod
+    def add_section_exclusions(course_codes: List[str], course_sessions: Dict, conflict_matrix: List[int]):
+        """Mark alternative sections of one course component as mutually exclusive.
+
+        "CS101 A LEC" and "CS101 B LEC" become rivals in the conflict matrix,
+        so a schedule holds at most one section per component per course and
+        the solver's clique bound sees each component as a single slot.
+        """
+        alternatives = defaultdict(list)
+        for i, code in enumerate(course_codes):
+            parts = parse_course_code(code)
+            if parts is None:
+                continue
+            component = parts['type'] or str(course_sessions[code][0].get('type', '')).upper()
+            alternatives[(parts['subject'], parts['number'], component)].append(i)
+
+        for sections in alternatives.values():
+            group_mask = 0
+            for i in sections:
+                group_mask |= 1 << i
+            for i in sections:
+                conflict_matrix[i] |= group_mask & ~(1 << i)
+
+    @staticmethod
+    def collapse_equivalent(course_codes: List[str], conflict_matrix: List[int],
+                            slot_masks: List[int]) -> Tuple[List[str], List[int], Dict]:
+        """Merge interchangeable courses into one representative each.
+
+        Two courses are interchangeable when they have the same day/time
+        vector and exactly the same closed neighbourhood in the conflict
+        matrix. Any schedule holds at most one of them and may swap it for
+        any other without changing its times, so the search only needs the
+        first. Equal neighbourhoods alone are not enough: with section
+        exclusions, sections at different times can clash with the same set.
+        Returns the representative codes, their conflict matrix and a map of
+        representative -> the other members of its class.
+        """
+        classes = OrderedDict()
+        for i in range(len(course_codes)):
+            classes.setdefault((slot_masks[i], conflict_matrix[i] | (1 << i)), []).append(i)
+
+        if len(classes) == len(course_codes):
+            return course_codes, conflict_matrix, {}
+
+        members = list(classes.values())
+        class_of = {}
+        for class_index, class_members in enumerate(members):
+            for i in class_members:
+                class_of[i] = class_index
+
+        class_codes = [course_codes[class_members[0]] for class_members in members]
+        class_matrix = []
+        for class_members in members:
+            row = 0
+            neighbours = conflict_matrix[class_members[0]] & ~sum(1 << i for i in class_members)
+            while neighbours:
+                low = neighbours & -neighbours
+                row |= 1 << class_of[low.bit_length() - 1]
+                neighbours ^= low
+            class_matrix.append(row)
 
+        alternatives = {
+            course_codes[class_members[0]]: [course_codes[i] for i in class_members[1:]]
+            for class_members in members if len(class_members) > 1
+        }
+        logging.info(f"Collapsed {len(course_codes)} courses into {len(class_codes)} time-equivalence classes")
+        return class_codes, class_matrix, alternatives
+
+    @staticmethod
+    def prepare(courses_input: List[Dict], section_aware: bool = False) -> Tuple[List[str], Dict, List[int], Dict]:
+        """Group sessions by course and precompute the conflict matrix.
+
+        Returns the codes the solver works on (one per equivalence class), all
+        sessions grouped by course, the conflict matrix over those codes and
+        the interchangeable alternatives of each representative.
+        """
         course_sessions = defaultdict(list)
         for course in courses_input:
             course_day = course['day']
@@ -24,72 +315,481 @@ class TimetableAlgorithm:
 
         course_codes = list(course_sessions.keys())
 
-        def check_conflicts(code1: str, code2: str) -> bool:
-            for s1 in course_sessions[code1]:
-                for s2 in course_sessions[code2]:
-                    if s1['day'] == s2['day']:
-                        start1 = datetime.strptime(s1['start_time'], '%H:%M').time()
-                        end1 = datetime.strptime(s1['end_time'], '%H:%M').time()
-                        start2 = datetime.strptime(s2['start_time'], '%H:%M').time()
-                        end2 = datetime.strptime(s2['end_time'], '%H:%M').time()
-                        if not (end1 <= start2 or end2 <= start1):
-                            return True
+        # Precompute once: every pairwise check below is a single integer AND
+        slot_masks = [TimetableAlgorithm.build_slot_mask(course_sessions[code]) for code in course_codes]
+        conflict_matrix = TimetableAlgorithm.build_conflict_matrix(slot_masks)
+        if section_aware:
+            TimetableAlgorithm.add_section_exclusions(course_codes, course_sessions, conflict_matrix)
+        course_codes, conflict_matrix, alternatives = TimetableAlgorithm.collapse_equivalent(
+            course_codes, conflict_matrix, slot_masks)
+        return course_codes, course_sessions, conflict_matrix, alternatives
+
+    @staticmethod
+    def iter_combinations(course_codes: List[str], conflict_matrix: List[int],
+                          solver: Optional[ScheduleSolver] = None,
+                          alternatives: Optional[Dict] = None) -> Iterator[Dict]:
+        """Lazily yield every maximum schedule with its excluded map"""
+        solver = solver or ScheduleSolver(conflict_matrix)
+        max_len = solver.find_max_size()
+
+        for schedule in solver.iter_schedules(max_len):
+            yield TimetableAlgorithm.build_result(schedule, course_codes, conflict_matrix, alternatives)
+
+    @staticmethod
+    def build_result(schedule: List[int], course_codes: List[str], conflict_matrix: List[int],
+                     alternatives: Optional[Dict] = None) -> Dict:
+        """Turn a schedule of course indices into its selected list and excluded map.
+
+        ``alternatives`` lists, per selected representative, the sections that
+        could replace it without changing anything else in the schedule.
+        """
+        selected = [course_codes[i] for i in schedule]
+        excluded = {}
+
+        for i, course_code in enumerate(course_codes):
+            if i not in schedule:
+                conflicts = [course_codes[j] for j in schedule if conflict_matrix[i] >> j & 1]
+                excluded[course_code] = conflicts
+
+        alternatives = alternatives or {}
+        return {
+            'selected': selected,
+            'excluded': excluded,
+            'alternatives': {code: alternatives[code] for code in selected if code in alternatives}
+        }
+
+
+class ScheduleCursor:
+    """Pages through generated schedules, pulling them from the solver on demand.
+
+    Pages already pulled are kept so that Previous never recomputes anything;
+    later pages are only generated once navigation reaches them. A worker
+    thread may generate pages while the GUI thread reads the known ones.
+    """
+
+    def __init__(self, schedules: Iterator[Dict], course_groups: Dict, page_size: int = SCHEDULE_PAGE_SIZE,
+                 solver: Optional[ScheduleSolver] = None, known: Optional[List[Dict]] = None,
+                 exhausted: bool = False, course_codes: Optional[List[str]] = None,
+                 alternatives: Optional[Dict] = None):
+        self._source = schedules
+        self.course_groups = course_groups
+        # Codes the solver worked on: one representative per equivalence class
+        self.course_codes = course_codes if course_codes is not None else list(course_groups.keys())
+        self.alternatives = alternatives or {}
+        self.solver = solver
+        self.page_size = page_size
+        self.pages = []
+        self.exhausted = exhausted
+        # False for a best-so-far result whose search ran out of time
+        self.optimal = True
+        # True when schedules come best first from a ScheduleRanker
+        self.ranked = False
+        # Called with the cursor after every newly generated page
+        self.on_extend = None
+        self._lock = threading.RLock()
+
+        known = known or []
+        for start in range(0, len(known), page_size):
+            self.pages.append(known[start:start + page_size])
+
+    @property
+    def known_count(self) -> int:
+        """Number of schedules generated so far"""
+        return sum(len(page) for page in self.pages)
+
+    def _load_next_page(self) -> bool:
+        if self.exhausted:
             return False
+        # Schedules restored under another page size can end mid-page. Top that
+        # page up first, so every page but the last holds page_size schedules
+        # and get() can index them directly.
+        last = self.pages[-1] if self.pages and len(self.pages[-1]) < self.page_size else None
+        wanted = self.page_size - len(last) if last is not None else self.page_size
+        page = list(islice(self._source, wanted))
+        if len(page) < wanted:
+            self.exhausted = True
+        if page:
+            if last is not None:
+                last.extend(page)
+            else:
+                self.pages.append(page)
+            if self.on_extend:
+                self.on_extend(self)
+        return bool(page)
+
+    def load_all(self):
+        """Generate every remaining page"""
+        with self._lock:
+            while self._load_next_page():
+                pass
+
+    def known_schedules(self) -> List[Dict]:
+        """Every schedule generated so far, in order"""
+        return [schedule for page in self.pages for schedule in page]
+
+    def is_known(self, index: int) -> bool:
+        """Whether the schedule at ``index`` is already generated; never runs the solver"""
+        return 0 <= index < self.known_count
+
+    def has(self, index: int) -> bool:
+        """Whether a schedule exists at ``index``, generating pages as needed"""
+        if self.is_known(index):
+            return True
+        with self._lock:
+            while index >= self.known_count:
+                if not self._load_next_page():
+                    return False
+        return index >= 0
 
-        def find_max_schedules():
-            n = len(course_codes)
-            max_schedules = []
-            max_len = 0
+    def get(self, index: int) -> Optional[Dict]:
+        """Return the schedule at ``index`` or None when there is no such schedule"""
+        if not self.has(index):
+            return None
+        return self.pages[index // self.page_size][index % self.page_size]
 
-            def backtrack(pos: int, current: List[int]):
-                nonlocal max_schedules, max_len
 
-                if pos == n:
-                    if len(current) > max_len:
-                        max_len = len(current)
-                        max_schedules.clear()
-                        max_schedules.append(current[:])
-                    elif len(current) == max_len:
-                        max_schedules.append(current[:])
-                    return
+class ScheduleRanker:
+    """Scores schedules on several objectives and keeps only the best ``k``.
 
-                current_code = course_codes[pos]
-                can_add = all(not check_conflicts(current_code, course_codes[i])
-                              for i in current)
+    Every objective is a penalty in natural units, lower is better:
+    ``campus_days`` counts days with classes, ``idle_gaps`` sums the hours
+    between classes on the same day, ``end_time`` averages how many hours
+    after MIN_HOUR each day finishes and ``lunch`` sums the hours taught
+    inside the lunch window. The score is the weighted sum.
+    """
 
-                if can_add:
-                    current.append(pos)
-                    backtrack(pos + 1, current)
-                    current.pop()
-                backtrack(pos + 1, current)
+    OBJECTIVES = ('campus_days', 'idle_gaps', 'end_time', 'lunch')
 
-            backtrack(0, [])
-            return max_schedules, max_len
+    def __init__(self, course_groups: Dict, weights: Dict, top_k: int = RANKING_TOP_K):
+        self.course_groups = course_groups
+        self.weights = {name: float(weights.get(name, 0)) for name in self.OBJECTIVES}
+        self.top_k = top_k
 
-        max_schedules, max_len = find_max_schedules()
+    def metrics(self, selected: List[str]) -> Dict:
+        days = defaultdict(list)
+        for course_code in selected:
+            for session in self.course_groups[course_code]:
+                days[session['day']].append((time_to_minutes(session['start_time']),
+                                             time_to_minutes(session['end_time'])))
 
-        results = []
-        for schedule in max_schedules:
-            selected = [course_codes[i] for i in schedule]
-            excluded = {}
+        lunch_start = time_to_minutes(LUNCH_START)
+        lunch_end = time_to_minutes(LUNCH_END)
+        idle = lunch = end_total = 0
+        for intervals in days.values():
+            intervals.sort()
+            finish = intervals[0][1]
+            for start, end in intervals[1:]:
+                idle += max(0, start - finish)
+                finish = max(finish, end)
+            end_total += finish - MIN_HOUR * 60
+            for start, end in intervals:
+                lunch += max(0, min(end, lunch_end) - max(start, lunch_start))
 
-            for i, course_code in enumerate(course_codes):
-                if i not in schedule:
-                    conflicts = [course_codes[j] for j in schedule if check_conflicts(course_code, course_codes[j])]
-                    excluded[course_code] = conflicts
+        return {
+            'campus_days': len(days),
+            'idle_gaps': idle / 60,
+            'end_time': end_total / 60 / len(days) if days else 0,
+            'lunch': lunch / 60
+        }
 
-            results.append({
-                'selected': selected,
-                'excluded': excluded
-            })
+    def score(self, metrics: Dict) -> float:
+        return sum(self.weights[name] * metrics[name] for name in self.OBJECTIVES)
 
-        return results, course_sessions
+    def iter_top(self, schedules: Iterator[Dict]) -> Iterator[Dict]:
+        """Consume ``schedules`` into a bounded heap and yield the best first.
+
+        Only ``top_k`` schedules are held at any time; nothing is generated
+        until the first schedule is requested.
+        """
+        heap = []
+        for sequence, schedule in enumerate(schedules):
+            metrics = self.metrics(schedule['selected'])
+            score = self.score(metrics)
+            # Max-heap on score via negation; earlier schedules win ties
+            entry = (-score, -sequence, schedule)
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            schedule['metrics'] = metrics
+            schedule['score'] = score
+
+        for _, _, schedule in sorted(heap, key=lambda entry: (-entry[0], -entry[1])):
+            yield schedule
+
+
+def ranking_enabled(weights: Optional[Dict]) -> bool:
+    """True when ranking weights would change the schedule order, i.e. any weight is non-zero"""
+    return bool(weights) and any(w for w in weights.values())
+
+
+def cart_fingerprint(courses_input: List[Dict], options: Optional[Dict] = None) -> str:
+    """Canonical hash of a cart's session rows and solver options, independent of row order"""
+    rows = sorted(json.dumps(course, sort_keys=True, default=str) for course in courses_input)
+    rows.insert(0, json.dumps(options or {}, sort_keys=True))
+    return hashlib.sha1('\n'.join(rows).encode('utf-8')).hexdigest()
 
 
 class TimetableService:
-    @staticmethod
-    def generate_timetable_combinations(courses_input: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """Generates schedules and memoizes them per cart and catalog version.
+
+    One instance is shared through AppContext so every controller reuses
+    the same solved carts. ``catalog_version`` is a callable returning the
+    current catalog data version; imports bump it, which retires old entries.
+    """
+
+    def __init__(self, catalog_version: Optional[Callable[[], int]] = None, schedule_cache=None,
+                 section_aware: bool = SECTION_AWARE_SCHEDULING, ranking_weights: Optional[Dict] = None):
+        self.catalog_version = catalog_version or (lambda: 0)
+        self.schedule_cache = schedule_cache
+        self.section_aware = section_aware
+        self.ranking_weights = dict(ranking_weights if ranking_weights is not None else SCHEDULE_RANKING_WEIGHTS)
+        self._memo = OrderedDict()
+        # The memo is shared with the worker and background refinement threads
+        self._lock = threading.RLock()
+        self._refining = set()
+
+    def generate_timetable_combinations(self, courses_input: List[Dict],
+                                        time_budget: Optional[float] = None) -> Tuple[List[Dict], Dict, bool]:
+        """Return ``(schedules, course_groups, optimal)`` for the cart.
+
+        Goes through the same memoized, section-aware and ranked path as the
+        cursors. Without ``time_budget`` every schedule is generated and
+        ``optimal`` is True. With a budget in seconds it returns within
+        roughly that time: the first page of schedules, or the best schedule
+        found so far with ``optimal`` False while the full search continues
+        in the background.
+        """
         logging.info(f"Received courses for timetable: {courses_input}")
-        schedules, course_groups = TimetableAlgorithm.generate_combinations(courses_input)
-        logging.info(f"Generated {len(schedules)} schedules and {len(course_groups)} course groups")
-        return schedules, course_groups
\ No newline at end of file
+        if time_budget is not None:
+            cursor = self.solve_anytime(courses_input, time_budget)
+            cursor.has(0)
+        else:
+            cursor = self.get_schedule_cursor(courses_input)
+            cursor.load_all()
+        schedules = cursor.known_schedules()
+        logging.info(f"Generated {len(schedules)} schedules and {len(cursor.course_groups)} course groups")
+        return schedules, cursor.course_groups, cursor.optimal
+
+    @staticmethod
+    def open_schedule_cursor(courses_input: List[Dict], progress=None, should_stop=None,
+                             section_aware: bool = False, ranking_weights: Optional[Dict] = None,
+                             deadline: Optional[float] = None) -> ScheduleCursor:
+        """Prepare a cursor that generates schedules page by page.
+
+        ``progress(nodes, best_size, best_codes)`` and ``should_stop()`` are
+        handed to the ScheduleSolver so a background worker can report
+        progress and cancel the search. With ``section_aware`` at most one
+        section per component of each course is chosen. ``ranking_weights``
+        switches to the top-k ranked schedules, best first. Past ``deadline``
+        the solver raises SearchTimeout.
+        """
+        logging.info(f"Opening schedule cursor for: {courses_input}")
+        course_codes, course_groups, conflict_matrix, alternatives = TimetableAlgorithm.prepare(courses_input,
+                                                                                               section_aware)
+
+        report = None
+        if progress:
+            def report(nodes, best_size, best_schedule):
+                progress(nodes, best_size, [course_codes[i] for i in best_schedule])
+
+        solver = ScheduleSolver(conflict_matrix, progress=report, should_stop=should_stop, deadline=deadline)
+        schedules = TimetableAlgorithm.iter_combinations(course_codes, conflict_matrix, solver, alternatives)
+        if ranking_enabled(ranking_weights):
+            schedules = ScheduleRanker(course_groups, ranking_weights).iter_top(schedules)
+        cursor = ScheduleCursor(schedules, course_groups, solver=solver, course_codes=course_codes,
+                                alternatives=alternatives)
+        cursor.ranked = ranking_enabled(ranking_weights)
+        return cursor
+
+    @staticmethod
+    def _load_first_pages(cursor: ScheduleCursor):
+        """Load the first page; a ranked cursor loads its whole top-k.
+
+        Ranking has consumed the full enumeration by the time the first
+        schedule comes out, so the rest of the top-k is already in memory.
+        Loading it here keeps later pages off the GUI thread and lets the
+        complete set be persisted.
+        """
+        cursor.has(0)
+        if cursor.ranked:
+            cursor.load_all()
+
+    def set_ranking_weights(self, weights: Dict):
+        """Change the ranking objectives; carts are re-ranked on their next request"""
+        self.ranking_weights = dict(weights)
+
+    def cache_key(self, courses_input: List[Dict]) -> Tuple[str, int]:
+        options = {'section_aware': self.section_aware, 'ranking_weights': self.ranking_weights,
+                   'top_k': RANKING_TOP_K}
+        return cart_fingerprint(courses_input, options), self.catalog_version()
+
+    def get_schedule_cursor(self, courses_input: List[Dict], progress=None, should_stop=None) -> ScheduleCursor:
+        """Return the memoized cursor for this cart, solving it on a miss.
+
+        The first page is loaded before the cursor is memoized, so a search
+        that is cancelled or fails never leaves a half-built entry behind.
+        """
+        return self._solve(self.cache_key(courses_input), courses_input, progress, should_stop)
+
+    def _solve(self, key: Tuple[str, int], courses_input: List[Dict], progress=None, should_stop=None) -> ScheduleCursor:
+        cursor = self._cached_cursor(key, courses_input)
+        if cursor is not None:
+            return cursor
+
+        cursor = self.open_schedule_cursor(courses_input, progress=progress, should_stop=should_stop,
+                                           section_aware=self.section_aware,
+                                           ranking_weights=self.ranking_weights)
+        self._load_first_pages(cursor)
+        cursor.solver.progress = None
+        cursor.solver.should_stop = None
+        self._persist(key, cursor)
+        self._remember(key, cursor)
+        return cursor
+
+    def _cached_cursor(self, key: Tuple[str, int], courses_input: List[Dict]) -> Optional[ScheduleCursor]:
+        """The memoized cursor for ``key``, else one restored from disk and memoized; None on a miss"""
+        cursor = self.lookup(key)
+        if cursor is None:
+            cursor = self._restore_cursor(key, courses_input)
+            if cursor is not None:
+                self._remember(key, cursor)
+        return cursor
+
+    def _remember(self, key: Tuple[str, int], cursor: ScheduleCursor):
+        """Memoize a solved cursor and write its future pages through to disk"""
+        if self.schedule_cache is not None:
+            cursor.on_extend = lambda extended: self._persist(key, extended)
+
+        with self._lock:
+            self._memo[key] = cursor
+            while len(self._memo) > SCHEDULE_MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+    def lookup(self, key: Tuple[str, int]) -> Optional[ScheduleCursor]:
+        """Memoized cursor for ``key``, if this cart has been solved"""
+        with self._lock:
+            cursor = self._memo.get(key)
+            if cursor is not None:
+                logging.info(f"Reusing solved timetable for cart {key[0][:12]} (catalog v{key[1]})")
+                self._memo.move_to_end(key)
+            return cursor
+
+    def solve_anytime(self, courses_input: List[Dict], time_budget: float, refine_in_background: bool = True,
+                      progress=None, should_stop=None) -> ScheduleCursor:
+        """Solve within ``time_budget`` seconds, falling back to the best found so far.
+
+        When the budget runs out the returned cursor holds the incumbent
+        schedule with ``optimal`` False. Unless ``refine_in_background`` is
+        off, a daemon thread then finishes the search and memoizes it, so the
+        next request for this cart gets the proven result.
+        """
+        key = self.cache_key(courses_input)
+        cursor = self._cached_cursor(key, courses_input)
+        if cursor is not None:
+            return cursor
+
+        cursor = self.open_schedule_cursor(courses_input, progress=progress, should_stop=should_stop,
+                                           section_aware=self.section_aware,
+                                           ranking_weights=self.ranking_weights,
+                                           deadline=time.monotonic() + time_budget)
+        try:
+            self._load_first_pages(cursor)
+        except SearchTimeout:
+            logging.info(f"Timetable search hit its {time_budget * 1000:.0f} ms budget, returning best so far")
+            solver = cursor.solver
+            known = [TimetableAlgorithm.build_result(solver.best_schedule, cursor.course_codes,
+                                                     solver.conflict_matrix, cursor.alternatives)]
+            provisional = ScheduleCursor(iter(()), cursor.course_groups, solver=solver, known=known, exhausted=True,
+                                         course_codes=cursor.course_codes, alternatives=cursor.alternatives)
+            provisional.optimal = False
+            if refine_in_background:
+                self._refine_in_background(key, courses_input)
+            return provisional
+
+        # Finished within budget: keep it like any other solved cart
+        cursor.solver.deadline = None
+        cursor.solver.progress = None
+        cursor.solver.should_stop = None
+        self._persist(key, cursor)
+        self._remember(key, cursor)
+        return cursor
+
+    def _refine_in_background(self, key: Tuple[str, int], courses_input: List[Dict]):
+        with self._lock:
+            if key in self._refining:
+                return
+            self._refining.add(key)
+
+        def refine():
+            try:
+                # Solve under the key of the original request; reading the catalog
+                # version again here would open a connection on this thread
+                self._solve(key, courses_input)
+                logging.info(f"Background refinement finished for cart {key[0][:12]}")
+            except Exception as e:
+                logging.error(f"Background timetable refinement failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refining.discard(key)
+                self.release_connections()
+
+        threading.Thread(target=refine, daemon=True).start()
+
+    def release_connections(self):
+        """Close the calling thread's cache connection before the thread exits"""
+        if self.schedule_cache is not None:
+            self.schedule_cache.release()
+
+    def _persist(self, key: Tuple[str, int], cursor: ScheduleCursor):
+        if self.schedule_cache is None:
+            return
+        selected = [schedule['selected'] for schedule in cursor.known_schedules()]
+        self.schedule_cache.store(key, cursor.course_codes, selected, cursor.exhausted)
+
+    def _restore_cursor(self, key: Tuple[str, int], courses_input: List[Dict]) -> Optional[ScheduleCursor]:
+        """Rebuild a cursor from the on-disk cache without searching again.
+
+        Schedules beyond the cached ones are regenerated lazily by re-running
+        the (deterministic) search and skipping what is already known. Ranked
+        sets are stored whole; a partial one, from an older build, would need
+        the full enumeration again for its next page, so it is re-solved instead.
+        """
+        if self.schedule_cache is None:
+            return None
+        cached = self.schedule_cache.load(key)
+        if cached is None:
+            return None
+        if ranking_enabled(self.ranking_weights) and not cached['exhausted']:
+            return None
+
+        course_codes, course_groups, conflict_matrix, alternatives = TimetableAlgorithm.prepare(courses_input,
+                                                                                               self.section_aware)
+        if course_codes != cached['course_codes']:
+            return None
+
+        position = {code: i for i, code in enumerate(course_codes)}
+        known = [
+            TimetableAlgorithm.build_result(sorted(position[code] for code in selected), course_codes,
+                                            conflict_matrix, alternatives)
+            for selected in cached['schedules']
+        ]
+
+        solver = ScheduleSolver(conflict_matrix)
+        if known:
+            solver.best_size = len(known[0]['selected'])
+        ranker = ScheduleRanker(course_groups, self.ranking_weights) if ranking_enabled(self.ranking_weights) else None
+        if ranker:
+            for schedule in known:
+                schedule['metrics'] = ranker.metrics(schedule['selected'])
+                schedule['score'] = ranker.score(schedule['metrics'])
+
+        schedules = TimetableAlgorithm.iter_combinations(course_codes, conflict_matrix, solver, alternatives)
+        if ranker:
+            schedules = ranker.iter_top(schedules)
+        remaining = islice(schedules, len(known), None)
+        logging.info(f"Restored {len(known)} cached schedules for cart {key[0][:12]}")
+        cursor = ScheduleCursor(remaining, course_groups, solver=solver, known=known, exhausted=cached['exhausted'],
+                                course_codes=course_codes, alternatives=alternatives)
+        cursor.ranked = ranker is not None
+        return cursor
@@ -0,0 +1,213 @@
+# utils/workers.py
+from PySide6.QtCore import QObject, Signal, Slot
+import logging
+import time
+from utils.timetable_service import SearchCancelled
+from database.import_session import ImportCancelled
+
+
+class TimetableWorker(QObject):
+    """Runs the schedule search off the GUI thread.
+
+    Meant to be moved to a QThread; ``run`` fetches the cart's schedule cursor
+    from the shared TimetableService, solving its first page on a cache miss
+    and reporting progress and the best schedule found so far. With a
+    ``time_budget`` (seconds) the best schedule found within the budget is
+    emitted as ``provisional`` before the search carries on to completion.
+    """
+    progress = Signal(int, int)  # nodes explored, best schedule size so far
+    partial_result = Signal(list)  # course codes of the best schedule so far
+    provisional = Signal(object)  # best-so-far ScheduleCursor once the time budget ran out
+    finished = Signal(object)  # ScheduleCursor with its first page loaded
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, timetable_service, cart_courses, time_budget=None, db_manager=None):
+        super().__init__()
+        self.timetable_service = timetable_service
+        self.db = db_manager  # the catalog version is read on this thread
+        self.cart_courses = cart_courses
+        self.time_budget = time_budget
+        self._cancel_requested = False
+        self._best_size = 0
+
+    def cancel(self):
+        """Ask the running search to stop at its next checkpoint"""
+        self._cancel_requested = True
+
+    def _is_cancelled(self):
+        return self._cancel_requested
+
+    def _report_progress(self, nodes, best_size, best_codes):
+        self.progress.emit(nodes, best_size)
+        if best_size > self._best_size:
+            self._best_size = best_size
+            self.partial_result.emit(list(best_codes))
+
+    @Slot()
+    def run(self):
+        try:
+            cursor = None
+            if self.time_budget is not None:
+                cursor = self.timetable_service.solve_anytime(
+                    self.cart_courses,
+                    self.time_budget,
+                    refine_in_background=False,
+                    progress=self._report_progress,
+                    should_stop=self._is_cancelled
+                )
+                if not cursor.optimal:
+                    # Show the best so far, then keep refining on this thread
+                    self.provisional.emit(cursor)
+                    cursor = None
+
+            if cursor is None:
+                cursor = self.timetable_service.get_schedule_cursor(
+                    self.cart_courses,
+                    progress=self._report_progress,
+                    should_stop=self._is_cancelled
+                )
+
+            # Later pages are pulled from the GUI thread during navigation
+            self.progress.emit(cursor.solver.nodes, cursor.solver.best_size)
+            self.finished.emit(cursor)
+        except SearchCancelled:
+            logging.info("Timetable generation cancelled")
+            self.cancelled.emit()
+        except Exception as e:
+            logging.error(f"Error generating timetable: {str(e)}")
+            self.failed.emit(str(e))
+        finally:
+            self.timetable_service.release_connections()
+            if self.db is not None:
+                self.db.release_connections()
+
+
+class SchedulePageWorker(QObject):
+    """Generates the next page of a schedule cursor off the GUI thread.
+
+    Meant to be moved to a QThread; ``run`` asks the cursor for the schedule
+    at ``index``, which pulls the page holding it from the solver.
+    """
+    finished = Signal(object)  # the cursor, with the page loaded
+    failed = Signal(str)
+
+    def __init__(self, timetable_service, cursor, index):
+        super().__init__()
+        self.timetable_service = timetable_service
+        self.cursor = cursor
+        self.index = index
+
+    @Slot()
+    def run(self):
+        try:
+            self.cursor.has(self.index)
+            self.finished.emit(self.cursor)
+        except Exception as e:
+            logging.error(f"Error loading schedule page: {str(e)}")
+            self.failed.emit(str(e))
+        finally:
+            # New pages are written through to the schedule cache from this thread
+            self.timetable_service.release_connections()
+
+
+class CourseSearchWorker(QObject):
+    """Runs catalog searches on a long-lived worker thread.
+
+    Requests arrive through a queued signal tagged with an increasing id. The
+    controller bumps ``latest_request`` as soon as it issues a new one, so a
+    request that was superseded while queued or running is skipped and its
+    results are never emitted. An empty query browses the catalog a page at a
+    time; further pages are fetched with ``load_page``.
+    """
+    results_ready = Signal(int, str, list)  # request id, query, courses
+    page_ready = Signal(int, list)  # request id, next catalog page
+    failed = Signal(int, str)
+
+    def __init__(self, db_manager):
+        super().__init__()
+        self.db = db_manager
+        self.latest_request = 0
+
+    def _is_stale(self, request_id):
+        return request_id < self.latest_request
+
+    @Slot(int, str)
+    def search(self, request_id, query):
+        if self._is_stale(request_id):
+            return
+        try:
+            courses = self.db.search_courses(query) if query else self.db.iter_courses()
+        except Exception as e:
+            logging.error(f"Error searching courses: {str(e)}")
+            self.failed.emit(request_id, str(e))
+            return
+        if not self._is_stale(request_id):
+            self.results_ready.emit(request_id, query, courses)
+
+    @Slot(int, str)
+    def load_page(self, request_id, after_code):
+        if self._is_stale(request_id):
+            return
+        try:
+            courses = self.db.iter_courses(after_code)
+        except Exception as e:
+            logging.error(f"Error loading course page: {str(e)}")
+            self.failed.emit(request_id, str(e))
+            return
+        if not self._is_stale(request_id):
+            self.page_ready.emit(request_id, courses)
+
+
+class ImportWorker(QObject):
+    """Runs a course or translation import off the GUI thread.
+
+    Meant to be moved to a QThread; ``run`` imports an already parsed
+    ImportSession and reports rows written, the file's total (0 if unknown),
+    throughput and the estimated seconds left (-1 if unknown). ``cancel``
+    stops it at the next batch, and the import is rolled back.
+    """
+    progress = Signal(int, int, float, float)  # rows done, total rows, rows per second, seconds left
+    finished = Signal(int)  # rows imported
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, db_manager, session):
+        super().__init__()
+        self.db = db_manager
+        self.session = session
+        self._cancel_requested = False
+        self._started = None
+
+    def cancel(self):
+        """Ask the running import to stop and roll back at its next batch"""
+        self._cancel_requested = True
+
+    def _is_cancelled(self):
+        return self._cancel_requested
+
+    def _report_progress(self, rows_done, total_rows):
+        elapsed = time.monotonic() - self._started
+        rate = rows_done / elapsed if elapsed > 0 else 0.0
+        total_rows = max(total_rows, rows_done) if total_rows else 0  # a CSV's total is an estimate
+        eta = (total_rows - rows_done) / rate if total_rows and rate else -1.0
+        self.progress.emit(rows_done, total_rows, rate, eta)
+
+    @Slot()
+    def run(self):
+        self._started = time.monotonic()
+        try:
+            added = self.db.import_session(
+                self.session,
+                progress=self._report_progress,
+                should_stop=self._is_cancelled
+            )
+            self.finished.emit(added)
+        except ImportCancelled:
+            logging.info("Import cancelled")
+            self.cancelled.emit()
+        except Exception as e:
+            logging.error(f"Error importing {self.session.file_path}: {str(e)}")
+            self.failed.emit(str(e))
+        finally:
+            self.db.release_connections()
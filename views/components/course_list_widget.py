@@ -192,6 +192,9 @@ class CourseCard(QWidget):
 class CourseListWidget(QScrollArea):
     course_added = Signal(str)
     course_removed = Signal(str)
+    load_more_requested = Signal()  # scrolled (or sized) to within a card or two of the end
+
+    LOAD_MORE_THRESHOLD = 200  # px from the bottom
 
     def __init__(self, is_cart=False):
         super().__init__()
@@ -230,6 +233,16 @@ class CourseListWidget(QScrollArea):
 
         self.setWidget(self.container)
 
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._check_load_more)
+        # Also fires when a page did not fill the viewport
+        scroll_bar.rangeChanged.connect(self._check_load_more)
+
+    def _check_load_more(self, *args):
+        scroll_bar = self.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - self.LOAD_MORE_THRESHOLD:
+            self.load_more_requested.emit()
+
     def set_courses(self, courses):
         if courses is None:
             courses = []
@@ -241,6 +254,10 @@ class CourseListWidget(QScrollArea):
             if widget:
                 widget.deleteLater()
 
+        self.append_courses(courses)
+
+    def append_courses(self, courses):
+        """Add cards below the current ones, e.g. for the next catalog page"""
         # Group courses by course_code
         grouped_courses = {}
         for course in courses:
@@ -34,4 +34,8 @@ class CourseSearchPage(QWidget):
 
     def set_courses(self, courses):
         """Update the course list with new courses"""
-        self.course_list.set_courses(courses)
\ No newline at end of file
+        self.course_list.set_courses(courses)
+
+    def append_courses(self, courses):
+        """Add the next page of courses to the list"""
+        self.course_list.append_courses(courses)
\ No newline at end of file
@@ -4,21 +4,25 @@ from PySide6.QtWidgets import (
     QLabel, QFileDialog, QProgressBar, QMessageBox,
     QTextEdit
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, QThread, Signal, Slot
 import logging
 from database.db_manager import DatabaseManager
+from database.import_session import ImportSession
+from utils.workers import ImportWorker
 import os
-import pandas as pd
 
 
 class ImportDialog(QDialog):
     import_completed = Signal(bool, str)  # Success status and message
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db_manager=None):
         super().__init__(parent)
-        self.db = DatabaseManager()
+        self.db = db_manager or DatabaseManager()
         self.setup_ui()
         self.selected_file = None
+        self.session = None  # ImportSession of the selected file, parsed once
+        self._import_thread = None
+        self._import_worker = None
 
     def setup_ui(self):
         """Setup the dialog UI"""
@@ -64,7 +68,7 @@ class ImportDialog(QDialog):
         button_layout.addWidget(self.import_button)
 
         self.cancel_button = QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.reject)
+        self.cancel_button.clicked.connect(self.on_cancel_clicked)
         button_layout.addWidget(self.cancel_button)
 
         layout.addLayout(button_layout)
@@ -86,11 +90,12 @@ class ImportDialog(QDialog):
         if not self.selected_file:
             return
 
-        # Validate file format
-        is_valid, message = self.db.validate_file_format(self.selected_file)
+        # Parse once; validation, preview and import all reuse the session
+        self.session = ImportSession(self.selected_file)
+        is_valid, message = self.session.validate()
 
         if is_valid:
-            self.status_label.setText("File format is valid")
+            self.status_label.setText(message)
             self.status_label.setStyleSheet("color: green;")
             self.import_button.setEnabled(True)
             self.show_preview()
@@ -102,84 +107,177 @@ class ImportDialog(QDialog):
 
     def show_preview(self):
         try:
-            file_extension = self.selected_file.lower().split('.')[-1]
-
-            if file_extension == 'csv':
-                df = pd.read_csv(self.selected_file)
-                self._show_course_preview(df)
-            elif file_extension in ['xlsx', 'xls']:
-                xls = pd.ExcelFile(self.selected_file)
-                translation_sheets = ['Programs', 'Program_Majors', 'Course_Groups',
-                                      'Major_Requirements', 'Course_Equivalences']
-
-                if all(sheet in xls.sheet_names for sheet in translation_sheets):
-                    self._show_translation_preview(xls)
-                else:
-                    df = pd.read_excel(self.selected_file)
-                    self._show_course_preview(df)
+            if self.session.kind == 'translation':
+                self._show_translation_preview(self.session.sheets)
             else:
-                raise ValueError("Unsupported file format")
+                self._show_course_preview(self.session.courses)
 
         except Exception as e:
             self.preview_text.setText(f"Error reading file: {str(e)}")
 
     def import_courses(self):
-        try:
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)  # Indeterminate progress
-            self.import_button.setEnabled(False)
-            self.browse_button.setEnabled(False)
-            self.status_label.setText("Importing courses...")
-
-            # Import courses
-            courses_added = self.db.import_courses_from_file(self.selected_file)
-
-            if courses_added > 0:
-                message = f"Successfully imported {courses_added} courses"
-                self.status_label.setText(message)
-                self.status_label.setStyleSheet("color: green;")
-                self.import_completed.emit(True, message)
-
-                # Show success message
-                QMessageBox.information(
-                    self,
-                    "Import Successful",
-                    message
-                )
-                self.accept()
-            else:
-                raise Exception("No courses were imported")
+        """Run the import on a worker thread, reporting its progress"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # Indeterminate until the first report
+        self.import_button.setEnabled(False)
+        self.browse_button.setEnabled(False)
+        self.status_label.setText("Importing courses...")
+        self.status_label.setStyleSheet("color: #666;")
 
-        except Exception as e:
-            error_message = f"Import failed: {str(e)}"
-            self.status_label.setText(error_message)
-            self.status_label.setStyleSheet("color: red;")
-            self.import_completed.emit(False, error_message)
+        # Parented, so the thread outlives _import_done until it has quit
+        thread = QThread(self)
+        worker = ImportWorker(self.db, self.session)
+        worker.moveToThread(thread)
 
-            # Show error message
-            QMessageBox.critical(
-                self,
-                "Import Failed",
-                error_message
-            )
+        thread.started.connect(worker.run)
+        worker.progress.connect(self.on_import_progress)
+        worker.finished.connect(self.on_import_finished)
+        worker.failed.connect(self.on_import_failed)
+        worker.cancelled.connect(self.on_import_cancelled)
+        for done in (worker.finished, worker.failed, worker.cancelled):
+            done.connect(thread.quit)
+        thread.finished.connect(self.on_import_thread_finished)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
 
-        finally:
-            self.progress_bar.setVisible(False)
-            self.import_button.setEnabled(True)
-            self.browse_button.setEnabled(True)
+        self._import_thread = thread
+        self._import_worker = worker
+        thread.start()
+
+    def on_cancel_clicked(self):
+        if self._import_worker is not None:
+            self.cancel_import()
+        else:
+            self.reject()
+
+    def cancel_import(self, wait=False):
+        """Stop a running import, which rolls it back; ``wait`` blocks until it has"""
+        worker, thread = self._import_worker, self._import_thread
+        if worker is not None:
+            worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling import...")
+
+        if wait and thread is not None:
+            # Also covers an import that is done but whose thread has not quit yet
+            self._import_worker = None
+            self._import_thread = None
+            thread.quit()
+            thread.wait()
+
+    def done(self, result):
+        # Closing mid-import cancels it first, so nothing is left half written;
+        # either way the worker thread has stopped before the dialog goes
+        self.cancel_import(wait=True)
+        super().done(result)
+
+    def _is_current_worker(self):
+        # Signals from a worker cancelled on close may still be queued
+        return self.sender() is not None and self.sender() is self._import_worker
+
+    def _import_done(self):
+        self._import_worker = None
+        self.progress_bar.setVisible(False)
+        self.import_button.setEnabled(True)
+        self.browse_button.setEnabled(True)
+        self.cancel_button.setEnabled(True)
+
+    @Slot()
+    def on_import_thread_finished(self):
+        if self.sender() is self._import_thread:
+            self._import_thread = None
+
+    @Slot(int, int, float, float)
+    def on_import_progress(self, rows_done, total_rows, rate, eta):
+        if not self._is_current_worker():
+            return
+        if total_rows:
+            self.progress_bar.setRange(0, total_rows)
+            self.progress_bar.setValue(rows_done)
+            status = f"Imported {rows_done:,} of {total_rows:,} rows"
+        else:
+            status = f"Imported {rows_done:,} rows"
+        status += f" ({rate:,.0f} rows/s"
+        status += f", about {eta:.0f} s left)" if eta >= 0 else ")"
+        self.status_label.setText(status)
+
+    @Slot(int)
+    def on_import_finished(self, courses_added):
+        if not self._is_current_worker():
+            return
+        self._import_done()
+        if courses_added <= 0:
+            self._show_import_error("No courses were imported")
+            return
+
+        message = f"Successfully imported {courses_added} courses"
+        if self.session.rejected_count:
+            message += f" ({self.session.rejected_count} invalid rows skipped)"
+        self.status_label.setText(message)
+        self.status_label.setStyleSheet("color: green;")
+        self.import_completed.emit(True, message)
+
+        # Show success message
+        self._show_import_message(QMessageBox.Information, "Import Successful", message)
+        self.accept()
+
+    @Slot(str)
+    def on_import_failed(self, error):
+        if not self._is_current_worker():
+            return
+        self._import_done()
+        self._show_import_error(error)
+
+    @Slot()
+    def on_import_cancelled(self):
+        if not self._is_current_worker():
+            return
+        self._import_done()
+        self.status_label.setText("Import cancelled; the existing data was kept")
+        self.status_label.setStyleSheet("color: #666;")
+
+    def _show_import_error(self, error):
+        error_message = f"Import failed: {error}"
+        self.status_label.setText(error_message)
+        self.status_label.setStyleSheet("color: red;")
+        self.import_completed.emit(False, error_message)
+
+        # Show error message
+        self._show_import_message(QMessageBox.Critical, "Import Failed", error_message)
+
+    def _show_import_message(self, icon, title, text):
+        """Message box for the import outcome; skipped rows go in its detailed text"""
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(icon)
+        msg_box.setWindowTitle(title)
+        msg_box.setText(text)
+        report = self._rejected_rows_report()
+        if report:
+            msg_box.setDetailedText(report)
+        msg_box.setStandardButtons(QMessageBox.Ok)
+        msg_box.exec()
+
+    def _rejected_rows_report(self):
+        """The first IMPORT_ERROR_LIMIT skipped rows, one per line, or None if none were skipped"""
+        if self.session is None or not self.session.errors:
+            return None
+        lines = [f"Line {line} ({course_code}): {reason}" for line, course_code, reason in self.session.errors]
+        hidden = self.session.rejected_count - len(self.session.errors)
+        if hidden > 0:
+            lines.append(f"... and {hidden} more")
+        return "\n".join(lines)
 
     def _show_course_preview(self, df):
         preview_text = "Headers:\n"
-        preview_text += ", ".join(df.columns) + "\n\n"
+        preview_text += ", ".join(map(str, df.columns)) + "\n\n"
         preview_text += "First 5 rows:\n"
         preview_text += df.head().to_string()
         self.preview_text.setText(preview_text)
 
-    def _show_translation_preview(self, xls):
+    def _show_translation_preview(self, sheets):
         preview_text = "Translation Data Sheets:\n\n"
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet)
+        for sheet, (headers, row_count) in sheets.items():
             preview_text += f"{sheet}:\n"
-            preview_text += "Headers: " + ", ".join(df.columns) + "\n"
-            preview_text += "Row count: " + str(len(df)) + "\n\n"
+            preview_text += "Headers: " + ", ".join(map(str, headers)) + "\n"
+            preview_text += "Row count: " + (str(row_count) if row_count is not None else "unknown") + "\n\n"
         self.preview_text.setText(preview_text)
\ No newline at end of file
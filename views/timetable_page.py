@@ -2,14 +2,14 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTableWidget, QTableWidgetItem,
-    QToolTip
+    QToolTip, QSpinBox
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont, QColor
 import logging
 
 class CustomTableWidgetItem(QTableWidgetItem):
-    def __init__(self, code, name, venue, day, start_time, end_time, instructor):
+    def __init__(self, code, name, venue, day, start_time, end_time, instructor, alternatives=None):
         super().__init__()
         self.code = code
         self.name = name
@@ -18,14 +18,27 @@ class CustomTableWidgetItem(QTableWidgetItem):
         self.start_time = start_time
         self.end_time = end_time
         self.instructor = instructor
-        self.setToolTip(
+        self.alternatives = alternatives or []
+        tooltip = (
             f"Course: {code} - {name}\n"
             f"Venue: {venue}\n"
             f"Instructor: {instructor}\n"
             f"Time: {start_time}-{end_time}\n"
         )
+        if self.alternatives:
+            tooltip += f"Same time: {', '.join(self.alternatives)}\n"
+        self.setToolTip(tooltip)
 
 class TimetablePage(QWidget):
+    weights_changed = Signal(dict)  # ranking objective -> weight
+
+    RANKING_LABELS = {
+        'campus_days': "Fewer days",
+        'idle_gaps': "Fewer gaps",
+        'end_time': "Finish early",
+        'lunch': "Free lunch",
+    }
+
     def __init__(self):
         super().__init__()
         self.setup_ui()
@@ -58,6 +71,43 @@ class TimetablePage(QWidget):
 
         layout.addLayout(nav_layout)
 
+        # Generation progress
+        progress_layout = QHBoxLayout()
+        self.progress_label = QLabel()
+        self.progress_label.setStyleSheet("color: #666;")
+        progress_layout.addWidget(self.progress_label)
+        progress_layout.addStretch()
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setVisible(False)
+        progress_layout.addWidget(self.cancel_button)
+
+        layout.addLayout(progress_layout)
+
+        # Ranking preferences
+        ranking_layout = QHBoxLayout()
+        ranking_layout.addWidget(QLabel("Rank by:"))
+        self.weight_inputs = {}
+        for objective, label in self.RANKING_LABELS.items():
+            spin_box = QSpinBox()
+            spin_box.setRange(0, 10)
+            ranking_layout.addWidget(QLabel(label))
+            ranking_layout.addWidget(spin_box)
+            self.weight_inputs[objective] = spin_box
+        ranking_layout.addStretch()
+
+        self.apply_weights_button = QPushButton("Apply")
+        self.apply_weights_button.clicked.connect(
+            lambda: self.weights_changed.emit(self.get_weights())
+        )
+        ranking_layout.addWidget(self.apply_weights_button)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: #666;")
+
+        layout.addLayout(ranking_layout)
+        layout.addWidget(self.summary_label)
+
         # Timetable widget
         self.timetable = QTableWidget()
         self.setup_timetable()
@@ -110,6 +160,7 @@ class TimetablePage(QWidget):
                         print(code, name, instructor, "____________________")
                         print(instructor)
                         venue = course.get('venue', '')
+                        alternatives = course.get('alternatives', [])
                     else:
                         logging.error(f"Unsupported course data type: {type(course)}")
                         continue
@@ -124,13 +175,16 @@ class TimetablePage(QWidget):
                         logging.error(f"Invalid day value: {day_index}")
                         continue
 
-                    item = CustomTableWidgetItem(code, name, venue, day_index, start_time, end_time, instructor)
+                    item = CustomTableWidgetItem(code, name, venue, day_index, start_time, end_time, instructor,
+                                                 alternatives)
                     display_text = (
                         f"{code}\n"
                         f"{start_time}-{end_time}\n"
                         f"{instructor}\n"
                         f"@ {venue}"
                     )
+                    if alternatives:
+                        display_text += f"\n(+{len(alternatives)} same-time section{'s' if len(alternatives) != 1 else ''})"
                     item.setText(display_text)
                     item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
 
@@ -158,9 +212,46 @@ class TimetablePage(QWidget):
         color.setHsvF(hue, 0.3, 1.0, 0.3)
         return color
 
-    def update_navigation_status(self, current, total):
-        self.nav_status.setText(f"Schedule {current} of {total}")
-        logging.info(f"Navigation status updated to: Schedule {current} of {total}")
+    def update_navigation_status(self, current, total, more=False):
+        total_text = f"{total}+" if more else f"{total}"
+        self.nav_status.setText(f"Schedule {current} of {total_text}")
+        logging.info(f"Navigation status updated to: Schedule {current} of {total_text}")
+
+    def set_weights(self, weights):
+        for objective, spin_box in self.weight_inputs.items():
+            spin_box.setValue(int(weights.get(objective, 0)))
+
+    def get_weights(self):
+        return {objective: spin_box.value() for objective, spin_box in self.weight_inputs.items()}
+
+    def show_schedule_summary(self, metrics):
+        """Describe how the displayed schedule does on each ranking objective"""
+        if not metrics:
+            self.summary_label.clear()
+            return
+        self.summary_label.setText(
+            f"{metrics['campus_days']} campus day{'s' if metrics['campus_days'] != 1 else ''}, "
+            f"{metrics['idle_gaps']:.1f} h idle, "
+            f"finishing {metrics['end_time']:.1f} h after the first slot on average, "
+            f"{metrics['lunch']:.1f} h over lunch"
+        )
+
+    def set_generating(self, generating):
+        """Toggle the page between searching and browsing schedules"""
+        self.cancel_button.setVisible(generating)
+        if generating:
+            self.prev_button.setEnabled(False)
+            self.next_button.setEnabled(False)
+            self.apply_weights_button.setEnabled(False)
+            self.progress_label.setText("Generating timetables...")
+        else:
+            self.apply_weights_button.setEnabled(True)
+            self.progress_label.clear()
+
+    def update_generation_progress(self, nodes, best_size):
+        self.progress_label.setText(
+            f"Explored {nodes:,} combinations, best so far: {best_size} course{'s' if best_size != 1 else ''}"
+        )
 
     def clear_timetable(self):
         self.timetable.clearContents()
\ No newline at end of file